@@ -1,3 +1,11 @@
 from django.contrib import admin
 
-# Register your models here.
+from .models import ConvertJob
+
+
+@admin.register(ConvertJob)
+class ConvertJobAdmin(admin.ModelAdmin):
+    list_display = ('id', 'user', 'cv', 'status', 'created_at', 'updated_at')
+    list_filter = ('status',)
+    search_fields = ('user__email',)
+    readonly_fields = ('created_at', 'updated_at')
@@ -1,3 +1,51 @@
+import uuid
+
+from django.conf import settings
 from django.db import models
 
-# Create your models here.
+
+class ConvertJob(models.Model):
+    """
+    A competence conversion running in the background.
+
+    Created by ConvertCVView when the client opts into asynchronous mode;
+    the client polls the job until it is completed or failed.
+    """
+
+    STATUS_PENDING = 'pending'
+    STATUS_RUNNING = 'running'
+    STATUS_COMPLETED = 'completed'
+    STATUS_FAILED = 'failed'
+    STATUS_CHOICES = [
+        (STATUS_PENDING, 'Pending'),
+        (STATUS_RUNNING, 'Running'),
+        (STATUS_COMPLETED, 'Completed'),
+        (STATUS_FAILED, 'Failed'),
+    ]
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name='convert_jobs',
+    )
+    cv = models.ForeignKey(
+        'cv.CV',
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='convert_jobs',
+    )
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default=STATUS_PENDING)
+    result = models.JSONField(null=True, blank=True)
+    error = models.TextField(blank=True, default='')
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        ordering = ['-created_at']
+        verbose_name = 'Convert job'
+        verbose_name_plural = 'Convert jobs'
+
+    def __str__(self):
+        return f"ConvertJob {self.id} ({self.status})"
@@ -0,0 +1,79 @@
+"""
+JSON renderer/parser backed by orjson, plus an event-stream renderer.
+
+The JSON classes fall back to DRF's stdlib-json implementations when orjson is not
+installed or cannot encode a payload. The renderer also defers to DRF whenever a
+request or setting asks for output orjson can't produce (indentation, spaced
+separators, ASCII escaping), so for compact output the bytes match
+JSONRenderer's. One difference remains: NaN and infinities are written as
+`null` rather than raising under STRICT_JSON.
+"""
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import BaseRenderer, JSONRenderer
+from rest_framework.utils.encoders import JSONEncoder
+
+try:
+    import orjson  # type: ignore
+except ImportError:  # pragma: no cover - optional dependency
+    orjson = None
+
+
+# Datetimes are passed through to DRF's encoder so their wire format
+# (ISO 8601, millisecond precision, "Z" suffix) matches JSONRenderer exactly.
+_ORJSON_OPTIONS = (
+    orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME if orjson else 0
+)
+_fallback_encoder = JSONEncoder()
+
+
+class ORJSONRenderer(JSONRenderer):
+    """Drop-in replacement for DRF's JSONRenderer using orjson."""
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if orjson is None:
+            return super().render(data, accepted_media_type, renderer_context)
+        if data is None:
+            return b""
+        if (
+            not self.compact
+            or self.ensure_ascii
+            or self.get_indent(accepted_media_type, renderer_context or {}) is not None
+        ):
+            return super().render(data, accepted_media_type, renderer_context)
+        try:
+            ret = orjson.dumps(data, default=_fallback_encoder.default, option=_ORJSON_OPTIONS)
+        except (orjson.JSONEncodeError, TypeError):
+            return super().render(data, accepted_media_type, renderer_context)
+        # Same escaping as JSONRenderer: keeps the output safe to embed in JS.
+        return ret.replace(b"\xe2\x80\xa8", b"\\u2028").replace(b"\xe2\x80\xa9", b"\\u2029")
+
+
+class ORJSONParser(JSONParser):
+    """Drop-in replacement for DRF's JSONParser using orjson."""
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        if orjson is None:
+            return super().parse(stream, media_type, parser_context)
+        try:
+            return orjson.loads(stream.read())
+        except orjson.JSONDecodeError as exc:
+            raise ParseError(f"JSON parse error - {exc}")
+
+
+class EventStreamRenderer(BaseRenderer):
+    """
+    Lets `Accept: text/event-stream` pass content negotiation on views that
+    return a StreamingHttpResponse. Only error responses are rendered through
+    it, as a single SSE frame.
+    """
+
+    media_type = "text/event-stream"
+    format = "sse"
+    charset = "utf-8"
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b""
+        payload = ORJSONRenderer().render(data)
+        return b"data: " + payload + b"\n\n"
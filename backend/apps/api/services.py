@@ -0,0 +1,210 @@
+"""
+Conversion helpers shared by the synchronous endpoint and background jobs.
+"""
+
+import hashlib
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Iterator, Optional
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connection, transaction
+from django.utils import timezone
+
+from apps.llm.coalescing import SingleFlight
+from apps.llm.services import generate_competence_cv, stream_competence_cv
+
+from .models import ConvertJob
+
+logger = logging.getLogger(__name__)
+
+CONVERT_JOB_FAILED_MESSAGE = "Conversion failed. Please try again."
+
+# Concurrent conversions of identical CV text share one LLM call.
+_competence_flight = SingleFlight()
+
+_job_executor: Optional[ThreadPoolExecutor] = None
+_job_executor_lock = threading.Lock()
+
+
+def _cv_text_key(cv_text: str) -> str:
+    return hashlib.blake2b(cv_text.encode("utf-8"), digest_size=16).hexdigest()
+
+
+def _should_cache_competence(result: Dict[str, Any]) -> bool:
+    # An unparseable reply comes back without skills (the summary falls back
+    # to the raw text, or is empty); retry those instead of pinning them.
+    return bool(result.get("skills"))
+
+
+def competence_for_text(cv_text: str) -> dict:
+    """
+    Return the LLM competence result for `cv_text`, reusing a cached result
+    for identical text and sharing in-flight calls between concurrent requests.
+    """
+    text_key = _cv_text_key(cv_text)
+    cache_key = f"cv:llm:competence:{text_key}"
+    cached = cache.get(cache_key)
+    if cached is not None:
+        return cached
+
+    def compute() -> dict:
+        result = generate_competence_cv(cv_text)
+        if _should_cache_competence(result):
+            cache.set(cache_key, result, settings.LLM_RESULT_CACHE_TIMEOUT)
+        return result
+
+    return _competence_flight.do(text_key, compute)
+
+
+def stream_competence_for_text(cv_text: str) -> Iterator[Dict[str, Any]]:
+    """
+    Streaming counterpart of `competence_for_text`.
+
+    A cached result is emitted as a single "done" chunk; otherwise tokens are
+    streamed from the LLM and the final result is cached. Streams are not
+    coalesced, since each client needs its own token feed.
+    """
+    cache_key = f"cv:llm:competence:{_cv_text_key(cv_text)}"
+    cached = cache.get(cache_key)
+    if cached is not None:
+        yield {"type": "done", **cached}
+        return
+
+    for chunk in stream_competence_cv(cv_text):
+        if chunk["type"] == "done":
+            result = {
+                "competence_summary": chunk["competence_summary"],
+                "skills": chunk["skills"],
+            }
+            if _should_cache_competence(result):
+                cache.set(cache_key, result, settings.LLM_RESULT_CACHE_TIMEOUT)
+        yield chunk
+
+
+class ConvertQuotaExceeded(Exception):
+    """Raised when a user already has the maximum number of converts running."""
+
+
+class ConvertSlot:
+    """
+    One of a user's concurrent convert slots; `release()` is idempotent.
+
+    Callers that hand the remaining work to a stream or background job set
+    `handed_off` and pass `release` along, so the slot lives as long as the
+    LLM work does.
+    """
+
+    def __init__(self, key: Optional[str]) -> None:
+        self._key = key
+        self._released = False
+        self.handed_off = False
+
+    def release(self) -> None:
+        if self._released or self._key is None:
+            return
+        self._released = True
+        try:
+            cache.decr(self._key)
+        except ValueError:
+            # The counter expired while the convert was running.
+            pass
+
+
+def acquire_convert_slot(user_id) -> ConvertSlot:
+    """
+    Reserve a convert slot for `user_id`, or raise ConvertQuotaExceeded.
+
+    The counter lives in the shared cache (Redis when REDIS_URL is set), so
+    the cap holds across workers. It expires CONVERT_SLOT_TIMEOUT seconds
+    after it was created, which also forgives slots leaked by a killed worker.
+    """
+    limit = settings.CONVERT_MAX_INFLIGHT_PER_USER
+    if limit <= 0:
+        return ConvertSlot(None)
+
+    key = f"cv:convert:inflight:{user_id}"
+    timeout = settings.CONVERT_SLOT_TIMEOUT
+    if cache.add(key, 1, timeout):
+        count = 1
+    else:
+        try:
+            count = cache.incr(key)
+        except ValueError:
+            cache.set(key, 1, timeout)
+            count = 1
+
+    if count > limit:
+        try:
+            cache.decr(key)
+        except ValueError:
+            pass
+        raise ConvertQuotaExceeded(
+            f"You already have {limit} conversions in progress. Try again shortly."
+        )
+    return ConvertSlot(key)
+
+
+def _get_job_executor() -> ThreadPoolExecutor:
+    global _job_executor
+    with _job_executor_lock:
+        if _job_executor is None:
+            _job_executor = ThreadPoolExecutor(
+                max_workers=settings.CONVERT_JOB_WORKERS,
+                thread_name_prefix="convert-job",
+            )
+        return _job_executor
+
+
+def _run_convert_job(
+    job_id, cv_text: str, source: dict, on_done: Optional[Callable[[], None]] = None
+) -> None:
+    # .update() skips auto_now, so updated_at is set explicitly.
+    jobs = ConvertJob.objects.filter(pk=job_id)
+    try:
+        jobs.update(status=ConvertJob.STATUS_RUNNING, updated_at=timezone.now())
+        llm_result = competence_for_text(cv_text)
+        jobs.update(
+            status=ConvertJob.STATUS_COMPLETED,
+            result={
+                "source": source,
+                "competence_summary": llm_result.get("competence_summary", ""),
+                "skills": llm_result.get("skills", []),
+            },
+            updated_at=timezone.now(),
+        )
+    except Exception:
+        # Details stay in the log; the exception text can carry upstream URLs
+        # and driver errors, and `error` is returned to the client.
+        logger.exception(f"[CONVERT_JOB] job_id={job_id} failed")
+        jobs.update(
+            status=ConvertJob.STATUS_FAILED,
+            error=CONVERT_JOB_FAILED_MESSAGE,
+            updated_at=timezone.now(),
+        )
+    finally:
+        if on_done is not None:
+            on_done()
+        # Executor threads outlive requests; don't leak their DB connection.
+        connection.close()
+
+
+def submit_convert_job(
+    job: ConvertJob,
+    cv_text: str,
+    source: dict,
+    on_done: Optional[Callable[[], None]] = None,
+) -> None:
+    """
+    Run the LLM step for `job` on the in-process job executor.
+    `on_done` is called once the job has finished, successfully or not.
+
+    Jobs live in this process only: if the worker restarts before a job
+    finishes, the row stays pending/running and the client should resubmit.
+    """
+    # Submit after commit so the worker thread can always see the job row.
+    transaction.on_commit(
+        lambda: _get_job_executor().submit(_run_convert_job, job.pk, cv_text, source, on_done)
+    )
@@ -1,3 +1,86 @@
-from django.test import TestCase
+from unittest import mock
 
-# Create your tests here.
+from django.core.cache import cache
+from django.test import SimpleTestCase, override_settings
+from rest_framework.renderers import JSONRenderer
+
+from .renderers import ORJSONRenderer
+from .services import ConvertQuotaExceeded, acquire_convert_slot, competence_for_text
+from .views import _parse_cv_id
+
+
+@override_settings(CONVERT_MAX_INFLIGHT_PER_USER=2, CONVERT_SLOT_TIMEOUT=60)
+class ConvertSlotTests(SimpleTestCase):
+    def setUp(self):
+        cache.clear()
+
+    def test_cap_is_enforced_per_user(self):
+        first = acquire_convert_slot(1)
+        acquire_convert_slot(1)
+        with self.assertRaises(ConvertQuotaExceeded):
+            acquire_convert_slot(1)
+
+        # Other users are unaffected.
+        acquire_convert_slot(2)
+
+        first.release()
+        acquire_convert_slot(1)
+
+    def test_release_is_idempotent(self):
+        slot = acquire_convert_slot(1)
+        slot.release()
+        slot.release()
+        acquire_convert_slot(1)
+        acquire_convert_slot(1)
+        with self.assertRaises(ConvertQuotaExceeded):
+            acquire_convert_slot(1)
+
+    @override_settings(CONVERT_MAX_INFLIGHT_PER_USER=0)
+    def test_zero_disables_the_cap(self):
+        for _ in range(5):
+            acquire_convert_slot(1)
+
+
+class ParseCvIdTests(SimpleTestCase):
+    def test_accepts_positive_integers(self):
+        self.assertEqual(_parse_cv_id(7), 7)
+        self.assertEqual(_parse_cv_id("42"), 42)
+
+    def test_rejects_malformed_ids(self):
+        for value in ("abc", "1.5", "-3", 0, None, True, [1]):
+            with self.subTest(value=value):
+                self.assertIsNone(_parse_cv_id(value))
+
+
+class CompetenceCacheTests(SimpleTestCase):
+    def setUp(self):
+        cache.clear()
+        self.addCleanup(cache.clear)
+
+    def test_result_with_skills_is_reused(self):
+        result = {"competence_summary": "Engineer", "skills": ["Python"]}
+        with mock.patch("apps.api.services.generate_competence_cv", return_value=result) as llm:
+            self.assertEqual(competence_for_text("cv"), result)
+            self.assertEqual(competence_for_text("cv"), result)
+        llm.assert_called_once()
+
+    def test_empty_result_is_not_cached(self):
+        empty = {"competence_summary": "", "skills": []}
+        with mock.patch("apps.api.services.generate_competence_cv", return_value=empty) as llm:
+            competence_for_text("cv")
+            competence_for_text("cv")
+        self.assertEqual(llm.call_count, 2)
+
+
+class ORJSONRendererTests(SimpleTestCase):
+    def test_compact_output_matches_json_renderer(self):
+        data = {"name": "Zo\u00eb", "note": "a\u2028b\u2029c", "items": [1, 2.5, None, True]}
+        self.assertEqual(ORJSONRenderer().render(data), JSONRenderer().render(data))
+
+    def test_indent_request_uses_json_renderer(self):
+        data = {"items": [1, 2]}
+        media_type = "application/json; indent=2"
+        self.assertEqual(
+            ORJSONRenderer().render(data, media_type),
+            JSONRenderer().render(data, media_type),
+        )
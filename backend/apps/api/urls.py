@@ -1,11 +1,12 @@
 from django.urls import path
 
-from .views import ConvertCVView, ProxyDebugHeadersView
+from .views import ConvertCVView, ConvertJobView, ProxyDebugHeadersView
 
 app_name = "api"
 
 urlpatterns = [
     path("convert/", ConvertCVView.as_view(), name="convert"),
+    path("convert/<uuid:job_id>/", ConvertJobView.as_view(), name="convert-job"),
     path("debug/proxy-headers/", ProxyDebugHeadersView.as_view(), name="debug-proxy-headers"),
 ]
 
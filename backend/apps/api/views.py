@@ -1,17 +1,122 @@
+import logging
+
 from django.conf import settings
-from django.http import Http404
+from django.http import Http404, StreamingHttpResponse
 from django.shortcuts import get_object_or_404
 from rest_framework import status
 from rest_framework import serializers
-from rest_framework.parsers import FormParser, JSONParser, MultiPartParser
+from rest_framework.parsers import FormParser, MultiPartParser
 from rest_framework.permissions import AllowAny, IsAuthenticated
 from rest_framework.response import Response
 from rest_framework.views import APIView
 from drf_spectacular.utils import extend_schema
+from apps.api.renderers import EventStreamRenderer, ORJSONParser, ORJSONRenderer
 from apps.cv.models import CV
-from apps.cv.services import get_or_extract_cv_text, read_cv_file
-from apps.llm.services import generate_competence_cv
+from apps.cv.parse_pool import read_cv_file_in_pool
+from apps.cv.services import CVTooLargeError, get_or_extract_cv_text
 from apps.interview.models import CompetencePaper
+from apps.llm.services import trim_to_token_budget
+from apps.users.authentication import JWTAuthentication
+from apps.api.models import ConvertJob
+from apps.api.services import (
+    ConvertQuotaExceeded,
+    acquire_convert_slot,
+    competence_for_text,
+    stream_competence_for_text,
+    submit_convert_job,
+)
+
+logger = logging.getLogger(__name__)
+
+
+def _get_cv(pk, user):
+    """
+    Fetch a CV for conversion in a single query, loading only the columns the
+    convert flow reads. Admins can access any CV; regular users only their own.
+    """
+    qs = CV.objects.only(
+        "id", "user_id", "file", "original_filename", "extracted_text", "text_extracted_at"
+    )
+    if getattr(user, "is_staff", False):
+        return get_object_or_404(qs, pk=pk)
+    return get_object_or_404(qs, pk=pk, user=user)
+
+
+def _parse_cv_id(value):
+    """Return `value` as a positive int, or None if it can't be a CV id."""
+    if isinstance(value, bool):
+        return None
+    try:
+        cv_id = int(value)
+    except (TypeError, ValueError):
+        return None
+    return cv_id if cv_id > 0 else None
+
+
+def _flag(request, name: str) -> bool:
+    value = request.data.get(name, request.query_params.get(name))
+    if isinstance(value, bool):
+        return value
+    return str(value).lower() in ("1", "true", "yes")
+
+
+def _wants_background(request) -> bool:
+    return _flag(request, "async")
+
+
+def _wants_stream(request) -> bool:
+    if _flag(request, "stream"):
+        return True
+    return getattr(request.accepted_renderer, "format", None) == "sse"
+
+
+class _ClosingStream:
+    """
+    Iterator wrapper that runs `on_close` when Django closes the response,
+    even if the client disconnected before iteration started (closing an
+    unstarted generator would skip its `finally`).
+    """
+
+    def __init__(self, iterable, on_close):
+        self._iterator = iter(iterable)
+        self._on_close = on_close
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        return next(self._iterator)
+
+    def close(self):
+        try:
+            close = getattr(self._iterator, "close", None)
+            if close is not None:
+                close()
+        finally:
+            self._on_close()
+
+
+def _sse_data(payload) -> str:
+    # Same serializer (orjson, with DRF's fallback) as the JSON responses.
+    return ORJSONRenderer().render(payload).decode("utf-8")
+
+
+def _stream_competence_sse(cv_text, source):
+    """
+    Generator that yields SSE-formatted chunks from stream_competence_for_text.
+    Tokens are sent as "data: {json}" frames; the final result is sent as an
+    "event: done" frame that also carries `source`.
+    """
+    try:
+        for chunk in stream_competence_for_text(cv_text):
+            if chunk["type"] == "done":
+                chunk = {**chunk, "source": source}
+                yield f"event: done\ndata: {_sse_data(chunk)}\n\n"
+            else:
+                yield f"data: {_sse_data(chunk)}\n\n"
+    except Exception as e:
+        logger.error(f"[convert_stream] Competence generation failed: {e}")
+        yield f"event: error\ndata: {_sse_data({'type': 'error', 'detail': 'Failed to generate competence summary'})}\n\n"
 
 
 class SchemaFallbackSerializer(serializers.Serializer):
@@ -22,17 +127,62 @@ class DocumentedAPIView(APIView):
     serializer_class = SchemaFallbackSerializer
 
 
-class ConvertCVView(DocumentedAPIView):
+class CachedPipelineMixin:
+    """
+    Reuse one instance of each authenticator, permission, parser and renderer
+    per view class instead of instantiating them on every request.
+
+    Only for views whose pipeline classes are stateless, as DRF's built-in
+    ones and ours are.
+    """
+
+    _pipeline_instances: dict = {}
+
+    @classmethod
+    def _pipeline(cls, attr):
+        key = (cls, attr)
+        instances = cls._pipeline_instances.get(key)
+        if instances is None:
+            instances = tuple(klass() for klass in getattr(cls, attr))
+            cls._pipeline_instances[key] = instances
+        return instances
+
+    def get_authenticators(self):
+        return self._pipeline("authentication_classes")
+
+    def get_permissions(self):
+        return self._pipeline("permission_classes")
+
+    def get_parsers(self):
+        return self._pipeline("parser_classes")
+
+    def get_renderers(self):
+        return self._pipeline("renderer_classes")
+
+
+class ConvertCVView(CachedPipelineMixin, DocumentedAPIView):
     """
     Conversion endpoint:
 
     - Accepts either a stored CV id (`cv_id`) or a directly uploaded file (`file`).
     - Uses existing CV parsing helpers to extract plain text.
     - Calls the LLM service to generate a competence summary and skills.
+    - With `stream=true` (or `Accept: text/event-stream`), streams LLM tokens
+      as Server-Sent Events and finishes with an `event: done` frame.
+    - With `async=true`, returns 202 and a `job_id` right after parsing; the
+      LLM step runs in the background and the result is polled from
+      `GET /api/convert/<job_id>/`.
+    - Each user may have CONVERT_MAX_INFLIGHT_PER_USER converts in progress
+      (including streams and background jobs); beyond that it returns 429.
     """
 
-    permission_classes = [IsAuthenticated]
-    parser_classes = (JSONParser, MultiPartParser, FormParser)
+    # The request pipeline is pinned here rather than inherited from settings:
+    # JWT only, no throttles, and orjson for the common {"cv_id": N} body.
+    authentication_classes = (JWTAuthentication,)
+    permission_classes = (IsAuthenticated,)
+    throttle_classes = ()
+    parser_classes = (ORJSONParser, MultiPartParser, FormParser)
+    renderer_classes = (ORJSONRenderer, EventStreamRenderer)
 
     def post(self, request, *args, **kwargs):
         cv_id = request.data.get("cv_id")
@@ -44,28 +194,94 @@ class ConvertCVView(DocumentedAPIView):
                 status=status.HTTP_400_BAD_REQUEST,
             )
 
+        if cv_id:
+            # Reject malformed ids before touching the database.
+            cv_id = _parse_cv_id(cv_id)
+            if cv_id is None:
+                return Response(
+                    {"detail": "'cv_id' must be a positive integer."},
+                    status=status.HTTP_400_BAD_REQUEST,
+                )
+
+        try:
+            slot = acquire_convert_slot(request.user.pk)
+        except ConvertQuotaExceeded as exc:
+            return Response(
+                {"detail": str(exc)},
+                status=status.HTTP_429_TOO_MANY_REQUESTS,
+            )
+
+        try:
+            return self._convert(request, cv_id, uploaded_file, slot)
+        finally:
+            if not slot.handed_off:
+                slot.release()
+
+    def _convert(self, request, cv_id, uploaded_file, slot):
         cv_instance = None
         original_filename = None
 
         if cv_id:
-            # Admins can access any CV; regular users only their own
-            if getattr(request.user, 'is_staff', False):
-                cv_instance = get_object_or_404(CV, pk=cv_id)
-            else:
-                cv_instance = get_object_or_404(CV, pk=cv_id, user=request.user)
+            cv_instance = _get_cv(cv_id, request.user)
             original_filename = cv_instance.original_filename
             cv_text = get_or_extract_cv_text(cv_instance)
         else:
             file_obj = uploaded_file
+            size = getattr(file_obj, "size", None)
+            if size and size > settings.CV_MAX_BYTES:
+                return Response(
+                    {"detail": "CV file is too large."},
+                    status=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+                )
             original_filename = getattr(uploaded_file, "name", None)
             content_type = getattr(uploaded_file, "content_type", None)
-            cv_text = read_cv_file(
-                file_obj,
-                name=original_filename,
-                content_type=content_type,
+            try:
+                cv_text = read_cv_file_in_pool(
+                    file_obj,
+                    name=original_filename,
+                    content_type=content_type,
+                    max_pages=settings.CV_MAX_PAGES,
+                )
+            except CVTooLargeError as exc:
+                return Response(
+                    {"detail": str(exc)},
+                    status=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+                )
+
+        # Bound prompt size; anything past this is rarely useful to the summary.
+        # The char cap keeps tokenization cheap; the token cap bounds LLM spend.
+        cv_text, num_tokens = trim_to_token_budget(
+            cv_text[: settings.CV_MAX_CHARS], settings.CV_MAX_TOKENS
+        )
+
+        logger.info(f"[convert] prompt cv_id={cv_instance.id if cv_instance else None} tokens={num_tokens}")
+
+        source = {
+            "cv_id": cv_instance.id if cv_instance else None,
+            "original_filename": original_filename,
+        }
+
+        if _wants_background(request):
+            job = ConvertJob.objects.create(user=request.user, cv=cv_instance)
+            submit_convert_job(job, cv_text, source, on_done=slot.release)
+            slot.handed_off = True
+            return Response(
+                {"job_id": str(job.id), "status": job.status},
+                status=status.HTTP_202_ACCEPTED,
+            )
+
+        if _wants_stream(request):
+            response = StreamingHttpResponse(
+                _ClosingStream(_stream_competence_sse(cv_text, source), slot.release),
+                content_type="text/event-stream",
             )
+            slot.handed_off = True
+            # Keep proxies from buffering the stream.
+            response["Cache-Control"] = "no-cache"
+            response["X-Accel-Buffering"] = "no"
+            return response
 
-        llm_result = generate_competence_cv(cv_text)
+        llm_result = competence_for_text(cv_text)
         competence_summary = llm_result.get("competence_summary", "")
         skills = llm_result.get("skills", [])
 
@@ -73,16 +289,42 @@ class ConvertCVView(DocumentedAPIView):
         # Storage will happen when user exports after editing
 
         response_data = {
-            "source": {
-                "cv_id": cv_instance.id if cv_instance else None,
-                "original_filename": original_filename,
-            },
+            "source": source,
             "competence_summary": competence_summary,
             "skills": skills,
         }
 
         return Response(response_data, status=status.HTTP_200_OK)
 
+
+class ConvertJobView(CachedPipelineMixin, DocumentedAPIView):
+    """
+    Poll a background conversion started with `async=true`.
+
+    Completed jobs include the same payload the synchronous endpoint returns
+    under `result`; failed jobs include an `error` message.
+    """
+
+    authentication_classes = (JWTAuthentication,)
+    permission_classes = (IsAuthenticated,)
+    throttle_classes = ()
+    renderer_classes = (ORJSONRenderer,)
+
+    def get(self, request, job_id, *args, **kwargs):
+        qs = ConvertJob.objects.only("id", "user_id", "status", "result", "error")
+        if getattr(request.user, "is_staff", False):
+            job = get_object_or_404(qs, pk=job_id)
+        else:
+            job = get_object_or_404(qs, pk=job_id, user=request.user)
+
+        response_data = {"job_id": str(job.id), "status": job.status}
+        if job.status == ConvertJob.STATUS_COMPLETED:
+            response_data["result"] = job.result
+        elif job.status == ConvertJob.STATUS_FAILED:
+            response_data["error"] = job.error
+        return Response(response_data, status=status.HTTP_200_OK)
+
+
 @extend_schema(exclude=True)
 class ProxyDebugHeadersView(APIView):
     """Temporary endpoint to inspect proxy forwarding headers for throttle tuning."""
@@ -0,0 +1,19 @@
+# Generated by Django 5.2.8 on 2026-10-16 09:12
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('cv', '0002_cv_extracted_text_cv_text_extracted_at'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='cv',
+            index=models.Index(fields=['user', '-uploaded_at'], name='cv_cv_user_id_5b4ca8_idx'),
+        ),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 5.2.8 on 2026-10-16 11:20
+
+import django.contrib.postgres.indexes
+import django.contrib.postgres.operations
+import django.db.models.functions.text
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('cv', '0003_cv_cv_user_id_5b4ca8_idx'),
+    ]
+
+    operations = [
+        django.contrib.postgres.operations.TrigramExtension(),
+        migrations.AddIndex(
+            model_name='cv',
+            index=django.contrib.postgres.indexes.GinIndex(django.contrib.postgres.indexes.OpClass(django.db.models.functions.text.Upper('original_filename'), name='gin_trgm_ops'), name='cv_fname_trgm_idx'),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.8 on 2026-10-16 11:45
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('cv', '0004_cv_fname_trgm_idx'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='cv',
+            name='content_sha256',
+            field=models.CharField(blank=True, db_index=True, default='', max_length=64),
+        ),
+    ]
@@ -1,11 +1,20 @@
 import os
 
 from django.conf import settings
+from django.contrib.postgres.indexes import GinIndex, OpClass
 from django.core.validators import FileExtensionValidator
 from django.db import models
+from django.db.models.functions import Upper
 
 
 def cv_upload_path(instance, filename):
+    # Content-addressed within the user's folder when the upload was hashed,
+    # so a user's identical files share one stored blob; legacy uploads keep
+    # the filename.
+    if instance.content_sha256:
+        ext = os.path.splitext(filename)[1].lower()
+        sha = instance.content_sha256
+        return os.path.join('cvs', f'user_{instance.user_id}', sha[:2], f'{sha}{ext}')
     return os.path.join('cvs', f'user_{instance.user_id}', filename)
 
 
@@ -20,6 +29,7 @@ class CV(models.Model):
         validators=[FileExtensionValidator(['pdf', 'docx'])],
     )
     original_filename = models.CharField(max_length=255)
+    content_sha256 = models.CharField(max_length=64, blank=True, default='', db_index=True)
     uploaded_at = models.DateTimeField(auto_now_add=True)
     extracted_text = models.TextField(blank=True, null=True)
     text_extracted_at = models.DateTimeField(blank=True, null=True)
@@ -28,6 +38,15 @@ class CV(models.Model):
         ordering = ('-uploaded_at',)
         verbose_name = 'CV'
         verbose_name_plural = 'CVs'
+        indexes = [
+            models.Index(fields=['user', '-uploaded_at']),
+            # Admin search runs UPPER(original_filename) LIKE '%term%'; a
+            # trigram index over the same expression lets Postgres use it.
+            GinIndex(
+                OpClass(Upper('original_filename'), name='gin_trgm_ops'),
+                name='cv_fname_trgm_idx',
+            ),
+        ]
 
     def __str__(self):
         return f'{self.user.email} - {self.original_filename}'
@@ -0,0 +1,104 @@
+"""
+Process pool for CPU-bound CV text extraction.
+
+python-docx (and PyPDF2, when PyMuPDF is not installed) parse in pure Python
+and hold the GIL, so with threaded workers concurrent parses in one process
+run one at a time. Handing the bytes
+to a small pool of worker processes lets several CVs parse in parallel.
+
+The pool is created lazily on first use (after gunicorn has forked) and uses
+the "spawn" start method so workers never inherit sockets or locks from the
+web process. It is off by default (CV_PARSE_WORKERS=0): every web worker
+would start its own pool, and the upload has to be read into memory to be
+sent to a worker, whereas in-process parsing reads it in place.
+"""
+
+import io
+import logging
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import BinaryIO, Optional
+
+from django.conf import settings
+
+from .services import read_cv_file
+
+logger = logging.getLogger(__name__)
+
+_executor: Optional[ProcessPoolExecutor] = None
+_executor_lock = threading.Lock()
+
+
+def _get_executor() -> Optional[ProcessPoolExecutor]:
+    global _executor
+    workers = getattr(settings, "CV_PARSE_WORKERS", 0)
+    if workers <= 0:
+        return None
+    with _executor_lock:
+        if _executor is None:
+            _executor = ProcessPoolExecutor(
+                max_workers=workers,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+        return _executor
+
+
+def _reset_executor() -> None:
+    global _executor
+    with _executor_lock:
+        if _executor is not None:
+            _executor.shutdown(wait=False, cancel_futures=True)
+        _executor = None
+
+
+def parse_bytes(
+    data: bytes,
+    name: Optional[str],
+    content_type: Optional[str],
+    max_pages: Optional[int] = None,
+) -> str:
+    """Worker entry point: extract text from raw CV bytes."""
+    return read_cv_file(
+        io.BytesIO(data), name=name, content_type=content_type, max_pages=max_pages
+    )
+
+
+def read_cv_file_in_pool(
+    file_obj: BinaryIO,
+    *,
+    name: Optional[str] = None,
+    content_type: Optional[str] = None,
+    max_pages: Optional[int] = None,
+) -> str:
+    """
+    Same contract as `read_cv_file`, but runs the parse in the process pool.
+
+    Falls back to in-process parsing when the pool is disabled or broken, or
+    when a worker takes longer than CV_PARSE_TIMEOUT seconds.
+    """
+    executor = _get_executor()
+    if executor is None:
+        return read_cv_file(
+            file_obj, name=name, content_type=content_type, max_pages=max_pages
+        )
+
+    try:
+        file_obj.seek(0)
+    except (AttributeError, OSError):
+        pass
+    data = file_obj.read()
+
+    timeout = getattr(settings, "CV_PARSE_TIMEOUT", 30)
+    try:
+        return executor.submit(parse_bytes, data, name, content_type, max_pages).result(timeout)
+    except TimeoutError:
+        # The stuck worker keeps its slot; start a fresh pool for later parses.
+        logger.warning("[PARSE_POOL] worker timed out after %ss; parsing in-process", timeout)
+        _reset_executor()
+        return parse_bytes(data, name, content_type, max_pages)
+    except BrokenProcessPool:
+        logger.warning("[PARSE_POOL] worker pool broken; parsing in-process", exc_info=True)
+        _reset_executor()
+        return parse_bytes(data, name, content_type, max_pages)
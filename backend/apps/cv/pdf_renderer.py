@@ -1,26 +1,58 @@
-from datetime import date, datetime
+import calendar
+import importlib.util
+import logging
+import mimetypes
+import re
+import threading
+from dataclasses import dataclass
+from datetime import date, datetime, timezone
+from functools import lru_cache
 from pathlib import Path
-from typing import Any, Dict, List, Optional
+from typing import TYPE_CHECKING, Any, Dict, Iterable, List, Optional, Set, Tuple
+from urllib.parse import urlsplit
+from urllib.request import url2pathname
 
-import textwrap
 from django.conf import settings
 
-from fpdf import FPDF
 from apps.llm.services import group_skills_into_categories
 
-try:
-  from jinja2 import Environment, FileSystemLoader  # type: ignore
-  from weasyprint import HTML  # type: ignore
-  _HTML_RENDER_AVAILABLE = True
-  # print("[PDF] ✅ WeasyPrint and Jinja2 are available")
-except Exception as exc:  # pragma: no cover - optional dependency
-  _HTML_RENDER_AVAILABLE = False
-  Environment = None  # type: ignore
-  FileSystemLoader = None  # type: ignore
-  HTML = None  # type: ignore
-  print(f"[PDF] WARNING: WeasyPrint/Jinja2 not available: {exc}")
-  import traceback
-  traceback.print_exc()
+if TYPE_CHECKING:  # pragma: no cover
+  from fpdf import FPDF
+  from jinja2 import Environment
+
+logger = logging.getLogger(__name__)
+
+# WeasyPrint loads its cairo/pango bindings on import, so the HTML backend is
+# only imported on the first render. These names are bound by
+# load_html_backend(); until then only the availability check has run.
+HTML = None  # type: ignore
+CSS = None  # type: ignore
+FontConfiguration = None  # type: ignore
+default_url_fetcher = None  # type: ignore
+_HTML_RENDER_AVAILABLE = all(
+  importlib.util.find_spec(name) is not None for name in ("jinja2", "weasyprint")
+)
+_html_backend_lock = threading.Lock()
+_html_backend_loaded = False
+
+
+def load_html_backend() -> bool:
+  """Import Jinja2/WeasyPrint on first use; returns whether they are usable."""
+  global HTML, CSS, FontConfiguration, default_url_fetcher
+  global _HTML_RENDER_AVAILABLE, _html_backend_loaded
+  if _html_backend_loaded or not _HTML_RENDER_AVAILABLE:
+    return _HTML_RENDER_AVAILABLE
+  with _html_backend_lock:
+    if not _html_backend_loaded:
+      try:
+        import jinja2  # type: ignore  # noqa: F401
+        from weasyprint import CSS, HTML, default_url_fetcher  # type: ignore
+        from weasyprint.text.fonts import FontConfiguration  # type: ignore
+      except Exception as exc:  # pragma: no cover - optional dependency
+        _HTML_RENDER_AVAILABLE = False
+        logger.warning("[PDF] WeasyPrint/Jinja2 not available: %s", exc, exc_info=True)
+      _html_backend_loaded = True
+  return _HTML_RENDER_AVAILABLE
 
 
 DEFAULT_SECTION_ORDER: List[str] = [
@@ -34,45 +66,229 @@ DEFAULT_SECTION_ORDER: List[str] = [
   "courses",
 ]
 
+_DEFAULT_SECTION_SET = frozenset(DEFAULT_SECTION_ORDER)
+
 # Keep left/right column defaults for the HTML template while allowing custom order.
 LEFT_COLUMN_KEYS = {"profile", "languages", "skills"}
 RIGHT_COLUMN_KEYS = {"work_experience", "certifications", "education", "projects", "courses"}
 
 
+# Sentence boundaries for the competence recommendation (any whitespace) and
+# the CV profile summary (spaces only, so line breaks inside a sentence stay).
+_SENTENCE_SPLIT_RE = re.compile(r"(?<=[.!?])\s+")
+_SENTENCE_SPLIT_SPACES_RE = re.compile(r"(?<=[.!?]) +")
+
+# C0/C1 control characters and DEL, except the ones str.split() treats as
+# whitespace (tab, newlines, \v, \f, \x1c-\x1f, NEL), which callers collapse
+# into spaces. PDF extraction sometimes leaves these in; they only show up as
+# blank glyphs in the output.
+_CONTROL_CHARS_RE = re.compile(r"[\x00-\x08\x0e-\x1b\x7f-\x84\x86-\x9f]+")
+
+# Runs of more than 60 non-space characters, which FPDF cannot line-break.
+_LONG_TOKEN_RE = re.compile(r"\S{61,}")
+
+# Static skill grouping for the competence template, checked in order.
+# Keywords match as plain substrings of the lower-cased skill.
+_SKILL_CATEGORY_KEYWORDS = (
+  ("Backend Development", ("python", "node.js", "nodejs", "php", "java", ".net", "c#", "ruby", "go", "golang", "rust", "spring", "django", "flask", "express", "laravel", "asp.net", "backend", "api", "rest", "graphql")),
+  ("Frontend & UI", ("react", "vue", "angular", "svelte", "frontend", "css", "html", "javascript", "typescript", "js", "ts", "jquery", "bootstrap", "tailwind", "sass", "scss", "webpack", "vite", "ui", "ux")),
+  ("Database & Data", ("sql", "database", "db", "mongo", "mongodb", "postgres", "postgresql", "mysql", "oracle", "redis", "cassandra", "dynamodb", "sqlite", "nosql", "firebase", "supabase")),
+  ("DevOps & Cloud", ("devops", "docker", "kubernetes", "k8s", "ci/cd", "ci", "cd", "cloud", "aws", "azure", "gcp", "jenkins", "gitlab", "github actions", "terraform", "ansible", "cloudinary", "heroku", "vercel", "netlify")),
+  ("Architecture & Practices", ("architecture", "design pattern", "clean code", "solid", "mvc", "mvvm", "microservices", "serverless", "event-driven", "tdd", "bdd", "agile", "scrum", "hexagonal", "onion", "adapter")),
+)
+_SKILL_CATEGORY_RES = tuple(
+  (category, re.compile("|".join(map(re.escape, keywords))))
+  for category, keywords in _SKILL_CATEGORY_KEYWORDS
+)
+
+
+# The same skill names recur across CVs, so the category is memoized.
+@lru_cache(maxsize=2048)
+def _categorize_skill(skill: str) -> str:
+  lower = skill.lower()
+  for category, pattern in _SKILL_CATEGORY_RES:
+    if pattern.search(lower):
+      return category
+  return "Other"
+
+
 def _parse_date(date_str: str) -> Optional[date]:
+  # LLM output may put anything here; only strings are cacheable.
   if not isinstance(date_str, str) or not date_str.strip():
     return None
-  raw = date_str.strip()
-  # Try full ISO first
-  for fmt in ("%Y-%m-%d", "%Y/%m/%d", "%Y-%m", "%Y/%m"):
-    try:
-      return datetime.strptime(raw, fmt).date()
-    except Exception:
-      pass
-  # Fallback: year only
+  return _parse_date_cached(date_str.strip())
+
+
+@lru_cache(maxsize=2048)
+def _parse_date_cached(raw: str) -> Optional[date]:
+  # Same results as trying strptime with %Y-%m-%d, %Y/%m/%d, %Y-%m and %Y/%m
+  # and then falling back to int() on the first four characters, but the
+  # common well-formed dates are sliced by hand instead of raising and
+  # catching a ValueError per format.
+  head = raw[:4]
+  sep = raw[4:5]
+  if len(head) == 4 and head.isdecimal() and head != "0000" and sep in ("-", "/"):
+    year = int(head)
+    parts = raw[5:].split(sep)
+    if len(parts) == 2 and len(parts[1]) == 2 and parts[1][0] == " ":
+      # strptime's %d also accepts a space-padded single digit.
+      parts[1] = parts[1][1:]
+    if len(parts) <= 2 and all(0 < len(p) <= 2 and p.isascii() and p.isdecimal() for p in parts):
+      month = int(parts[0])
+      day = int(parts[1]) if len(parts) == 2 else 1
+      if 1 <= month <= 12 and 1 <= day <= calendar.monthrange(year, month)[1]:
+        return date(year, month, day)
+
+  # Fallback: whatever int() makes of the year (so "7" and "+202" are years
+  # too), with the month clamped into range.
   try:
-    year = int(raw[:4])
-    month = int(raw[5:7]) if len(raw) >= 7 and raw[4] in {"-", "/"} else 1
+    year = int(head)
+    month = int(raw[5:7]) if len(raw) >= 7 and raw[4] in "-/" else 1
     return date(year, max(1, min(month, 12)), 1)
-  except Exception:
+  except ValueError:
     return None
 
 
-def _calculate_seniority_label(work_experience: Any) -> str:
-  if not isinstance(work_experience, list) or not work_experience:
-    return ""
-  total_months = 0
-  today = date.today()
+@dataclass(frozen=True, slots=True)
+class _Job:
+  title: str
+  company: str
+  location: str
+  from_: str
+  to: str
+  bullets: Tuple[str, ...]
+
+
+def _clean_str(value: Any) -> str:
+  return str(value or "").strip()
+
+
+def _join_nonempty(sep: str, first: str, second: str) -> str:
+  if first and second:
+    return f"{first}{sep}{second}"
+  return first or second or ""
+
+
+def _clean_strings(values: Any) -> List[str]:
+  """Stripped, non-empty string items of `values`; anything else is dropped."""
+  return [text for text in (v.strip() for v in values if isinstance(v, str)) if text]
+
+
+def _period(start: str, end: str, location: str = "") -> str:
+  """'start - end · location' for the CV template, skipping empty parts."""
+  period = _join_nonempty(" - ", start, end)
+  if location:
+    return f"{period} · {location}" if period else location
+  return period
+
+
+def _field(entry: Dict[str, Any], *keys: str) -> str:
+  """First truthy value among `keys` in `entry`, as a stripped string."""
+  for key in keys:
+    value = entry.get(key)
+    if value:
+      return str(value).strip()
+  return ""
+
+
+def _normalize_jobs(work_experience: Any) -> List[_Job]:
+  """
+  Normalize raw work_experience entries once per render: non-dict entries are
+  dropped, fields are stripped strings and bullets are non-empty strings.
+  """
+  if not isinstance(work_experience, list):
+    return []
+  jobs: List[_Job] = []
   for job in work_experience:
     if not isinstance(job, dict):
       continue
-    start = _parse_date(job.get("from") or "")
-    end = _parse_date(job.get("to") or "") or today
-    if start and end and end >= start:
-      months = (end.year - start.year) * 12 + (end.month - start.month)
-      if months < 0:
-        months = 0
-      total_months += months
+    bullets = job.get("bullets") or []
+    if not isinstance(bullets, list):
+      bullets = []
+    jobs.append(
+      _Job(
+        title=_clean_str(job.get("title")),
+        company=_clean_str(job.get("company")),
+        location=_clean_str(job.get("location")),
+        from_=_clean_str(job.get("from")),
+        to=_clean_str(job.get("to")),
+        bullets=tuple(b.strip() for b in bullets if isinstance(b, str) and b.strip()),
+      )
+    )
+  return jobs
+
+
+@dataclass(frozen=True, slots=True)
+class _Education:
+  degree: str
+  institution: str
+  from_: str
+  to: str
+
+
+@dataclass(frozen=True, slots=True)
+class _Project:
+  title: str
+  company: str
+  location: str
+  from_: str
+  to: str
+  bullets: Tuple[str, ...]
+
+
+def _normalize_education(education: Any) -> List[_Education]:
+  if not isinstance(education, list):
+    return []
+  return [
+    _Education(
+      degree=_field(edu, "degree"),
+      institution=_field(edu, "institution"),
+      from_=_field(edu, "from"),
+      to=_field(edu, "to"),
+    )
+    for edu in education
+    if isinstance(edu, dict)
+  ]
+
+
+def _normalize_projects(projects: Any) -> List[_Project]:
+  """Like _normalize_jobs; `name`/`context` are accepted for title/company."""
+  if not isinstance(projects, list):
+    return []
+  normalized: List[_Project] = []
+  for proj in projects:
+    if not isinstance(proj, dict):
+      continue
+    bullets = proj.get("bullets") or []
+    normalized.append(
+      _Project(
+        title=_field(proj, "title", "name"),
+        company=_field(proj, "company", "context"),
+        location=_field(proj, "location"),
+        from_=_field(proj, "from"),
+        to=_field(proj, "to"),
+        bullets=tuple(_clean_strings(bullets if isinstance(bullets, list) else ())),
+      )
+    )
+  return normalized
+
+
+def _month_index(date_str: str) -> Optional[int]:
+  parsed = _parse_date(date_str)
+  return parsed.year * 12 + parsed.month if parsed else None
+
+
+def _seniority_from_jobs(jobs: List[_Job]) -> str:
+  today = date.today()
+  current = today.year * 12 + today.month
+  total_months = 0
+  for job in jobs:
+    start = _month_index(job.from_)
+    if start is None:
+      continue
+    end = _month_index(job.to) or current
+    if end > start:
+      total_months += end - start
   if total_months <= 0:
     return ""
   if total_months < 3:
@@ -84,67 +300,130 @@ def _calculate_seniority_label(work_experience: Any) -> str:
   return "Senior"
 
 
-def _wrap_recommendation(text: str) -> str:
-  clean = (text or "").strip()
-  if not clean:
-    return ""
-  # Initial wrap to a reasonable width.
-  lines = textwrap.wrap(clean, width=65)
-  # If too few lines, wrap tighter to get 5-6 lines when possible.
-  if len(lines) < 5 and len(clean) > 0:
-    target_width = max(30, min(75, int(len(clean) / max(1, 5))))
-    lines = textwrap.wrap(clean, width=target_width)
-  return "<br>".join(lines[:6])
+def _calculate_seniority_label(work_experience: Any) -> str:
+  return _seniority_from_jobs(_normalize_jobs(work_experience))
+
+
+def _limit_by_length(items: List[str], tiers: Tuple[Tuple[int, int], ...]) -> List[str]:
+  """
+  Keep fewer items as their combined length grows. `tiers` is
+  ((threshold, keep), ...) from the largest threshold down; the first
+  threshold exceeded decides how many items are kept.
+  """
+  if not tiers:
+    return items
+  # Stop summing as soon as the largest threshold is passed.
+  top_threshold, top_keep = tiers[0]
+  total = 0
+  for item in items:
+    total += len(item)
+    if total > top_threshold:
+      return items[:top_keep]
+  for threshold, keep in tiers[1:]:
+    if total > threshold:
+      return items[:keep]
+  return items
+
+
+def _fit_prefix(lengths: Iterable[int], limit: int) -> int:
+  """Number of leading items whose running total of `lengths` stays within `limit`."""
+  total = 0
+  kept = 0
+  for length in lengths:
+    total += length
+    if total > limit:
+      break
+    kept += 1
+  return kept
+
+
+def _format_skill_groups(groups: List[Tuple[str, List[str]]], max_skills: int) -> List[str]:
+  return [f"{group}: {', '.join(skills[:max_skills])}" for group, skills in groups]
+
+
+def _skill_groups_length(groups: List[Tuple[str, List[str]]], max_skills: int) -> int:
+  """Total length of `_format_skill_groups(groups, max_skills)` without building it."""
+  total = 0
+  for group, skills in groups:
+    shown = skills[:max_skills]
+    total += len(group) + 2 + sum(map(len, shown)) + 2 * max(len(shown) - 1, 0)
+  return total
+
 
 def _normalize_section_order(raw_order: Optional[List[Any]]) -> List[str]:
   """
   Return a stable, de-duplicated section order containing only known keys.
   Missing defaults are appended at the end to preserve PDF completeness.
   """
-  seen = set()
-  order: List[str] = []
-  for key in raw_order or []:
-    if not isinstance(key, str):
-      continue
-    cleaned = key.strip().lower()
-    if cleaned in DEFAULT_SECTION_ORDER and cleaned not in seen:
-      order.append(cleaned)
-      seen.add(cleaned)
-  for key in DEFAULT_SECTION_ORDER:
-    if key not in seen:
-      order.append(key)
-      seen.add(key)
-  return order
+  # dict keeps insertion order, so it doubles as an ordered set.
+  order = dict.fromkeys(
+    cleaned
+    for cleaned in (k.strip().lower() for k in raw_order or () if isinstance(k, str))
+    if cleaned in _DEFAULT_SECTION_SET
+  )
+  order.update(dict.fromkeys(DEFAULT_SECTION_ORDER))
+  return list(order)
 
 
 def _sanitize_for_pdf(text: str) -> str:
   """
   Ensure the text only contains characters supported by the core Helvetica
-  font used by FPDF (latin-1). Any unsupported characters are dropped.
+  font used by FPDF (latin-1). Curly quotes, dashes and similar punctuation
+  are downgraded to ASCII; any other unsupported characters are dropped.
   """
   if not isinstance(text, str):
     return ""
-  try:
-    return text.encode("latin-1", "ignore").decode("latin-1")
-  except Exception:
-    return ""
-
-
-def _pdf_add_section_title(pdf: FPDF, title: str) -> None:
+  # ASCII is a subset of latin-1; str.isascii() reads a flag CPython already
+  # keeps on the string, so the common case skips hashing and encoding.
+  if not text.isascii():
+    text = _sanitize_for_pdf_cached(text)
+  # Whitespace is left alone: callers that write paragraphs rely on newlines.
+  if _CONTROL_CHARS_RE.search(text) is not None:
+    text = _CONTROL_CHARS_RE.sub("", text)
+  return text
+
+
+# Typographic punctuation LLM output is full of, mapped to the nearest
+# latin-1 text instead of being dropped by the encode below.
+_PDF_DOWNGRADE = str.maketrans({
+  "\u2018": "'", "\u2019": "'", "\u201a": "'",
+  "\u201c": '"', "\u201d": '"', "\u201e": '"',
+  "\u2013": "-", "\u2014": "-", "\u2212": "-",
+  "\u2026": "...", "\u2022": "-", "\u00a0": " ",
+})
+
+
+@lru_cache(maxsize=4096)
+def _sanitize_for_pdf_cached(text: str) -> str:
+  text = text.translate(_PDF_DOWNGRADE)
+  if text.isascii():
+    return text
+  # encode/decode runs in C; a str.translate table that drops every code
+  # point above 0xFF would go through a Python lookup per character and is
+  # much slower. With errors="ignore" this cannot raise.
+  return text.encode("latin-1", "ignore").decode("latin-1")
+
+
+def _pdf_add_section_title(pdf: "FPDF", title: str) -> None:
   pdf.set_font("Helvetica", "B", 14)
   pdf.set_text_color(0, 0, 0)
   pdf.ln(4)
   pdf.cell(0, 8, _sanitize_for_pdf(title), ln=True)
 
 
-def _pdf_add_small_heading(pdf: FPDF, text: str) -> None:
+def _pdf_add_small_heading(pdf: "FPDF", text: str) -> None:
   pdf.set_font("Helvetica", "B", 11)
   pdf.set_text_color(40, 40, 40)
   pdf.ln(2)
   pdf.cell(0, 6, _sanitize_for_pdf(text), ln=True)
 
 
-def _safe_multi_cell(pdf: FPDF, w: float, h: float, text: str) -> None:
+def _split_long_token(match: "re.Match[str]") -> str:
+  token = match.group()
+  return " ".join(token[i : i + 60] for i in range(0, len(token), 60))
+
+
+def _safe_multi_cell(pdf: "FPDF", w: float, h: float, text: str) -> None:
   """
   Wrapper around FPDF.multi_cell that:
   - sanitizes text to latin-1,
@@ -156,16 +435,9 @@ def _safe_multi_cell(pdf: FPDF, w: float, h: float, text: str) -> None:
   if not clean:
     return
 
-  # Insert breakpoints into very long tokens (no spaces) to avoid FPDF errors.
-  tokens = clean.split()
-  softened_tokens: List[str] = []
-  for tok in tokens:
-    if len(tok) > 60:
-      chunks = [tok[i : i + 60] for i in range(0, len(tok), 60)]
-      softened_tokens.append(" ".join(chunks))
-    else:
-      softened_tokens.append(tok)
-  softened = " ".join(softened_tokens)
+  # Collapse whitespace, then insert breakpoints into very long tokens (no
+  # spaces) to avoid FPDF errors. Only the rare long token reaches Python.
+  softened = _LONG_TOKEN_RE.sub(_split_long_token, " ".join(clean.split()))
 
   # Ensure there is always horizontal space: if w <= 0, use full width minus margins.
   effective_w = w if w and w > 0 else max(20, pdf.w - pdf.l_margin - pdf.r_margin - 2)
@@ -179,423 +451,386 @@ def _safe_multi_cell(pdf: FPDF, w: float, h: float, text: str) -> None:
       pdf.multi_cell(effective_w, h, truncated)
 
 
-def render_structured_cv_to_pdf(
-  structured_cv: Dict[str, Any], *, output_path: Path, html_template_path: Optional[Path] = None, section_order: Optional[List[str]] = None, cp_status: str = ""
-) -> Path:
+_BULLET_INDENT = 4
+_FPDF_CREATION_DATE = datetime(2000, 1, 1, tzinfo=timezone.utc)
+
+
+def _pdf_add_bullet(pdf: "FPDF", w: float, text: str) -> None:
+  """
+  Dash bullet with a hanging indent: an ASCII dash (safe in the core fonts)
+  in a fixed-width cell, then the text wrapped in `w` to its right.
   """
-  Render a normalized structured CV into a PDF.
+  pdf.set_x(pdf.l_margin)
+  pdf.cell(_BULLET_INDENT, 5, "-")
+  _safe_multi_cell(pdf, w, 5, text)
 
-  If a Jinja2/WeasyPrint HTML template is provided and dependencies are installed,
-  render with that template to preserve the exact visual layout. Otherwise, fall
-  back to the deterministic FPDF layout below.
-  
-  `section_order` allows customizing the order and visibility of sections.
-  Missing sections use defaults; custom keys are ignored.
+
+_known_templates: Set[str] = set()
+
+
+def _template_exists(template_path: Path) -> bool:
+  """
+  Path.exists() without a stat per render once a template has been found.
+  Outside DEBUG Jinja never re-reads a loaded template anyway; misses are not
+  cached, so a template deployed after startup is still picked up.
   """
+  key = str(template_path)
+  if key in _known_templates and not settings.DEBUG:
+    return True
+  if not template_path.exists():
+    return False
+  _known_templates.add(key)
+  return True
 
-  if not html_template_path:
-    print("[PDF] No html_template_path provided; using FPDF fallback")
-  elif not html_template_path.exists():
-    print(f"[PDF] Template not found at: {html_template_path}; using FPDF fallback")
-  elif not _HTML_RENDER_AVAILABLE:
-    print("[PDF] HTML render deps unavailable; using FPDF fallback")
 
-  normalized_order = _normalize_section_order(section_order)
+@lru_cache(maxsize=8)
+def _get_jinja_env(template_dir: str) -> "Environment":
+  """
+  One Environment per template directory, so compiled templates stay in
+  Jinja's cache between renders. Templates are only re-checked on disk when
+  DEBUG is on. Compiled bytecode is also kept on disk, so new worker
+  processes load it instead of compiling the templates again; Jinja keys it
+  by the template source checksum, so edits never hit a stale entry.
+  """
+  from jinja2 import Environment, FileSystemBytecodeCache, FileSystemLoader
 
-  if html_template_path and html_template_path.exists() and _HTML_RENDER_AVAILABLE:
-    print(f"[PDF] Using HTML template: {html_template_path}")
-    env = Environment(loader=FileSystemLoader(html_template_path.parent))
-    template = env.get_template(html_template_path.name)
+  bytecode_cache = None
+  if getattr(settings, "JINJA_BYTECODE_CACHE", False):
+    # An empty directory setting uses Jinja's per-user temp directory.
+    bytecode_cache = FileSystemBytecodeCache(getattr(settings, "JINJA_BYTECODE_CACHE_DIR", "") or None)
+  return Environment(
+    loader=FileSystemLoader(template_dir),
+    auto_reload=settings.DEBUG,
+    cache_size=400,
+    bytecode_cache=bytecode_cache,
+  )
 
-    # Detect if this is the competence template by filename
-    is_competence = "competence" in html_template_path.name.lower()
 
-    # Map structured_cv to competence template placeholders
-    if is_competence:
-      # Name
-      name = structured_cv.get("name") or structured_cv.get("full_name") or ""
-      # Seniority: try to extract from profile or work_experience
-      seniority = structured_cv.get("seniority") or ""
-      if not seniority:
-        # Try to infer from work_experience with month-accurate buckets
-        work_exp = structured_cv.get("work_experience") or []
-        seniority = _calculate_seniority_label(work_exp)
-      # Soft skills: from structured_cv["soft_skills"] or empty, limited to max 3
-      soft_skills = [str(s).strip() for s in (structured_cv.get("soft_skills") or []) if s][:3]
-      # Core skills: from structured_cv["core_skills"] or empty (same approach as soft_skills)
-      core_skills: List[str] = [str(s).strip() for s in (structured_cv.get("core_skills") or []) if s]
-      
-      # Tech competencies:
-      # Use AI-based grouping for tech competencies (max 6 groups), with a simple
-      # heuristic fallback if the LLM is unavailable.
-      tech_competencies: Dict[str, List[str]] = {}
-      tech_competencies_flat: List[str] = []
-
-      # 1) Prefer pre-grouped skills if the caller already provided them.
-      if isinstance(structured_cv.get("skills_grouped"), dict):
-        for k, v in structured_cv["skills_grouped"].items():
-          group_name = str(k).strip()
-          if not group_name:
-            continue
-          values = [str(s).strip() for s in (v or []) if str(s).strip()]
-          if values:
-            tech_competencies[group_name] = values
-
-      # 2) Use static keyword-based grouping (fast, no AI calls)
-      if not tech_competencies:
-        skills = [str(s).strip() for s in (structured_cv.get("skills") or []) if s]
-        for skill in skills:
-          key = "Other"
-          lower = skill.lower()
-          # Backend Development
-          if any(x in lower for x in ["python", "node.js", "nodejs", "php", "java", ".net", "c#", "ruby", "go", "golang", "rust", "spring", "django", "flask", "express", "laravel", "asp.net", "backend", "api", "rest", "graphql"]):
-            key = "Backend Development"
-          # Frontend & UI
-          elif any(x in lower for x in ["react", "vue", "angular", "svelte", "frontend", "css", "html", "javascript", "typescript", "js", "ts", "jquery", "bootstrap", "tailwind", "sass", "scss", "webpack", "vite", "ui", "ux"]):
-            key = "Frontend & UI"
-          # Database & Data
-          elif any(x in lower for x in ["sql", "database", "db", "mongo", "mongodb", "postgres", "postgresql", "mysql", "oracle", "redis", "cassandra", "dynamodb", "sqlite", "nosql", "firebase", "supabase"]):
-            key = "Database & Data"
-          # DevOps & Cloud
-          elif any(x in lower for x in ["devops", "docker", "kubernetes", "k8s", "ci/cd", "ci", "cd", "cloud", "aws", "azure", "gcp", "jenkins", "gitlab", "github actions", "terraform", "ansible", "cloudinary", "heroku", "vercel", "netlify"]):
-            key = "DevOps & Cloud"
-          # Architecture & Practices
-          elif any(x in lower for x in ["architecture", "design pattern", "clean code", "solid", "mvc", "mvvm", "microservices", "serverless", "event-driven", "tdd", "bdd", "agile", "scrum", "hexagonal", "onion", "adapter"]):
-            key = "Architecture & Practices"
-          tech_competencies.setdefault(key, []).append(skill)
-
-      # Flatten for template: list of "Group: skill1, skill2"
-      # Dynamic limiting based on total character count to prevent overflow
-      sorted_groups = sorted(tech_competencies.items(), key=lambda x: (x[0] == "Other", x[0]))
-      
-      # Build initial list with max 6 categories, 5 skills each
-      tech_competencies_items = []
-      for group, skills in sorted_groups[:6]:
-        if skills:
-          limited_skills = skills[:5]
-          tech_competencies_items.append(f"{group}: {', '.join(limited_skills)}")
-      
-      # Dynamic limiting: if total text > 400 chars, reduce to 4 categories with 4 skills each
-      # if > 300 chars, reduce to 3 categories with 3 skills each
-      tech_total = sum(len(item) for item in tech_competencies_items)
-      if tech_total > 400:
-        # Reduce to 4 categories, 4 skills each
-        tech_competencies_flat = []
-        for group, skills in sorted_groups[:4]:
-          if skills:
-            limited_skills = skills[:4]
-            tech_competencies_flat.append(f"{group}: {', '.join(limited_skills)}")
-      elif tech_total > 300:
-        # Reduce to 5 categories, 4 skills each
-        tech_competencies_flat = []
-        for group, skills in sorted_groups[:5]:
-          if skills:
-            limited_skills = skills[:4]
-            tech_competencies_flat.append(f"{group}: {', '.join(limited_skills)}")
-      else:
-        tech_competencies_flat = tech_competencies_items
-      # Languages: join name+level, limit to max 3
-      languages = []
-      for lang in structured_cv.get("languages") or []:
-        if isinstance(lang, dict):
-          name_ = str(lang.get("name") or "").strip()
-          level_ = str(lang.get("level") or "").strip()
-          if name_:
-            languages.append(f"{name_} ({level_})" if level_ else name_)
-          if len(languages) >= 3:
-            break
-      # Education: show up to 3 entries, reduce if text is too long
-      education_items = []
-      education_list = structured_cv.get("education") or []
-      for e in education_list[:3]:
-        if isinstance(e, dict):
-          degree = str(e.get('degree', '')).strip()
-          institution = str(e.get('institution', '')).strip()
-          edu_str = f"{degree} {institution}".strip()
-          if edu_str:
-            education_items.append(edu_str)
-      # Dynamic limiting: if total text > 200 chars, reduce to 2; if > 150, reduce to 1
-      edu_total = sum(len(e) for e in education_items)
-      if edu_total > 200:
-        education_items = education_items[:1]
-      elif edu_total > 150:
-        education_items = education_items[:2]
-      education = "\n".join(education_items)
-
-      # Trainings: show up to 3 entries, reduce if text is too long
-      all_trainings = []
-      for c in (structured_cv.get("certifications") or []):
-        if c:
-          all_trainings.append(str(c).strip())
-      for c in (structured_cv.get("courses") or []):
-        if c:
-          all_trainings.append(str(c).strip())
-      training_items = all_trainings[:3]
-      # Dynamic limiting: if total text > 200 chars, reduce to 2; if > 150, reduce to 1
-      train_total = sum(len(t) for t in training_items)
-      if train_total > 200:
-        training_items = training_items[:1]
-      elif train_total > 150:
-        training_items = training_items[:2]
-      trainings = "\n".join(training_items)
-      # Recommendation: limit to 500 chars to prevent overflow
-      recommendation_raw = structured_cv.get("profile") or structured_cv.get("summary") or ""
-      if len(recommendation_raw) > 500:
-        # Cut at last complete sentence within 500 chars
-        import re
-        sentences = re.split(r'(?<=[.!?])\s+', recommendation_raw)
-        recommendation = ''
-        for sentence in sentences:
-          if len(recommendation + sentence) <= 500:
-            recommendation += sentence + ' '
-          else:
-            break
-        recommendation = recommendation.strip()
-        # If still too long (single long sentence), hard cut at 497 + "..."
-        if len(recommendation) > 500:
-          recommendation = recommendation[:497] + "..."
-      else:
-        recommendation = recommendation_raw
-      # Project experience: include company name like in CV (latest 3 positions only)
-      # Dynamic limiting: reduce entries if text is too long
-      project_experience_items = []
-      for job in (structured_cv.get("work_experience") or [])[:3]:
-        if isinstance(job, dict):
-          title = job.get("title") or "Position"
-          company = job.get("company") or ""
-          period = job.get("from") or ""
-          # Format: "Title - Company (Period): bullets"
-          header = f"{title}"
-          if company:
-            header += f" - {company}"
-          if period:
-            header += f" ({period})"
-          bullets = [str(b) for b in job.get("bullets") or [] if b][:2]
-          if bullets:
-            bullets_text = "<br>".join(bullets)
-            project_experience_items.append(f"{header}: {bullets_text}")
-          else:
-            project_experience_items.append(header)
-      
-      # Dynamic limiting: if total text > 900 chars, reduce to 2; else show 3
-      proj_total = sum(len(p) for p in project_experience_items)
-      print(f"[DEBUG] Project Experience - Total chars: {proj_total}, Items: {len(project_experience_items)}")
-      if proj_total > 900:
-        print(f"[DEBUG] Reducing to 2 projects (total > 900)")
-        project_experience_flat = project_experience_items[:2]
-      else:
-        print(f"[DEBUG] Keeping all {len(project_experience_items)} projects (total <= 900)")
-        project_experience_flat = project_experience_items
-      # Footer logo absolute path (ensure visible in PDF)
-      footer_logo_path = (Path(settings.BASE_DIR) / "borek-logo" / "borek.jpeg").resolve()
-      footer_logo_url = footer_logo_path.as_uri() if footer_logo_path.exists() else ""
-
-      # Compose context for template
-      context = {
-        "name": name,
-        "seniority": seniority,
-        "core_skills": core_skills,
-        "soft_skills": soft_skills,
-        "languages": languages,
-        "education": education,
-        "trainings": trainings,
-        "recommendation": recommendation,
-        "tech_competencies_line": " | ".join(tech_competencies_flat),
-        "project_experience_line": " | ".join(project_experience_flat),
-        "footer_logo_url": footer_logo_url,
-        "cp_status": cp_status,
-      }
-      # Render with landscape orientation (force via CSS if needed)
-      html_out = template.render(**context)
-      output_path.parent.mkdir(parents=True, exist_ok=True)
-      try:
-        # WeasyPrint landscape workaround: use CSS @page { size: landscape; }
-        from weasyprint import CSS
-        css_landscape = CSS(string='@page { size: A4 landscape; }')
-        HTML(string=html_out).write_pdf(str(output_path), stylesheets=[css_landscape])
-        print("[PDF] HTML render completed (competence, landscape)")
-        return output_path
-      except Exception as exc:
-        print(f"[PDF] HTML render failed, falling back to FPDF: {exc}")
+def get_template(template_path: Path):
+  """Compiled template for `template_path`, shared by every caller in the process."""
+  return _get_jinja_env(str(template_path.parent)).get_template(template_path.name)
+
+
+@lru_cache(maxsize=1)
+def landscape_stylesheet() -> "CSS":
+  """Parsed once; CSS objects are read-only after construction."""
+  return CSS(string="@page { size: A4 landscape; }")
+
+
+@lru_cache(maxsize=8)
+def _logo_uri(path: str) -> Optional[str]:
+  """Resolve a bundled logo to a file:// URI once; None if it is missing."""
+  resolved = Path(path).resolve()
+  return resolved.as_uri() if resolved.exists() else None
+
+
+@lru_cache(maxsize=32)
+def _read_local_asset(url: str):
+  path = Path(url2pathname(urlsplit(url).path))
+  mime_type, _ = mimetypes.guess_type(path.name)
+  return path.read_bytes(), mime_type
+
+
+def _url_fetcher(url: str, *args, **kwargs):
+  """
+  Serve local assets (the logos) from memory after the first read; anything
+  else goes through WeasyPrint's default fetcher.
+  """
+  if url.startswith("file:"):
+    try:
+      data, mime_type = _read_local_asset(url)
+    except OSError:
+      pass
     else:
-      # ...existing code for normal CV template...
-      profile_summary_raw = str(structured_cv.get("profile") or "").strip()
-      # Use same limit as competence template (550 chars)
-      import re
-      sentences = re.split(r'(?<=[.!?]) +', profile_summary_raw)
-      profile_summary = ''
-      char_count = 0
-      for s in sentences:
-          if not s.strip():
-              continue
-          if char_count + len(s) > 550:
-              break
-          if profile_summary:
-              profile_summary += '\n'
-          profile_summary += s.strip()
-          char_count += len(s)
-      if not profile_summary:
-          profile_summary = profile_summary_raw[:550]
-      languages: List[Dict[str, str]] = []
-      for lang in structured_cv.get("languages") or []:
-        if isinstance(lang, dict):
-          name = str(lang.get("name") or "").strip()
-          level = str(lang.get("level") or "").strip()
-          if name:
-            languages.append({"name": name, "level": level})
-      skills = [str(s).strip() for s in structured_cv.get("skills") or [] if isinstance(s, str) and str(s).strip()]
-      skills = skills[:12]
-      experience: List[Dict[str, Any]] = []
-      for job in structured_cv.get("work_experience") or []:
-        if not isinstance(job, dict):
-          continue
-        title = str(job.get("title") or "").strip()
-        company = str(job.get("company") or "").strip()
-        location = str(job.get("location") or "").strip()
-        from_date = str(job.get("from") or "").strip()
-        to_date = str(job.get("to") or "").strip()
-        period_parts = [p for p in [from_date, to_date] if p]
-        period = " - ".join(period_parts)
-        if location:
-          period = f"{period} · {location}" if period else location
-        bullets = job.get("bullets") or []
-        competence_bullets = [str(b).strip()[:220] for b in bullets if isinstance(b, str) and str(b).strip()]
-        competence_bullets = competence_bullets[:4]
-        experience.append(
-          {
-            "title": title,
-            "company": company,
-            "period": period,
-            "competence_bullets": competence_bullets,
-          }
-        )
-      education: List[Dict[str, str]] = []
-      for edu in structured_cv.get("education") or []:
-        if not isinstance(edu, dict):
-          continue
-        degree = str(edu.get("degree") or "").strip()
-        institution = str(edu.get("institution") or "").strip()
-        from_date = str(edu.get("from") or "").strip()
-        to_date = str(edu.get("to") or "").strip()
-        period_parts = [p for p in [from_date, to_date] if p]
-        period = " - ".join(period_parts)
-        education.append({"period": period, "degree": degree, "institution": institution})
-      projects: List[Dict[str, Any]] = []
-      for proj in structured_cv.get("projects") or []:
-        if not isinstance(proj, dict):
-          continue
-        title = str(proj.get("title") or proj.get("name") or "").strip()
-        company = str(proj.get("company") or proj.get("context") or "").strip()
-        location = str(proj.get("location") or "").strip()
-        from_date = str(proj.get("from") or "").strip()
-        to_date = str(proj.get("to") or "").strip()
-        period_parts = [p for p in [from_date, to_date] if p]
-        period = " - ".join(period_parts)
-        if location:
-          period = f"{period} · {location}" if period else location
-        bullets = proj.get("bullets") or []
-        competence_bullets = [str(b).strip()[:220] for b in bullets if isinstance(b, str) and str(b).strip()]
-        competence_bullets = competence_bullets[:4]
-        projects.append(
-          {
-            "title": title,
-            "company": company,
-            "period": period,
-            "competence_bullets": competence_bullets,
-          }
-        )
-      courses = [str(c).strip() for c in structured_cv.get("courses") or [] if isinstance(c, str) and str(c).strip()]
-      certifications = [
-        str(c).strip()
-        for c in structured_cv.get("certifications") or []
-        if isinstance(c, str) and str(c).strip()
-      ]
-      # Logo is now in backend/borek-logo (same level as templates)
-      logo_path = html_template_path.parent.parent / "borek-logo" / "borek.png"
-      logo_src = logo_path.as_uri() if logo_path.exists() else None
-      context = {
-        "profile": {"summary": profile_summary},
-        "languages": languages,
-        "skills": skills,
-        "experience": experience,
-        "education": education,
-        "projects": projects,
-        "courses": courses,
-        "certifications": certifications,
-        "logo_src": logo_src,
-      }
-      html_out = template.render(**context)
-      output_path.parent.mkdir(parents=True, exist_ok=True)
-      try:
-        HTML(string=html_out).write_pdf(str(output_path))
-        print("[PDF] HTML render completed")
-        return output_path
-      except Exception as exc:
-        print(f"[PDF] HTML render failed, falling back to FPDF: {exc}")
+      return {"string": data, "mime_type": mime_type, "redirected_url": url}
+  return default_url_fetcher(url, *args, **kwargs)
+
+
+_thread_state = threading.local()
+
+
+def font_config() -> "FontConfiguration":
+  """
+  Reuse one FontConfiguration per thread instead of letting WeasyPrint build
+  a new one (and rescan fonts) on every write_pdf call.
+  """
+  config = getattr(_thread_state, "font_config", None)
+  if config is None:
+    config = FontConfiguration()
+    _thread_state.font_config = config
+  return config
+
 
-  print("[PDF] Using FPDF fallback layout")
+def warm_html_backend(render: bool = True) -> None:
+  """
+  Import WeasyPrint and compile the bundled templates before the first real
+  render. With `render`, also lay out one tiny page so fontconfig/pango setup
+  happens up front; the font config is per thread, so only do that in the
+  thread that will render afterwards.
+  """
+  if not load_html_backend():
+    return
+  try:
+    for template_path in (Path(settings.BASE_DIR) / "templates").glob("*.html"):
+      get_template(template_path)
+    if render:
+      HTML(string="<p></p>").write_pdf(font_config=font_config())
+  except Exception:
+    logger.warning("[PDF] HTML backend warm-up failed", exc_info=True)
+
+
+def _competence_context(structured_cv: Dict[str, Any], jobs: List[_Job], cp_status: str) -> Dict[str, Any]:
+  """Template context for the landscape competence paper."""
+  # Name
+  name = structured_cv.get("name") or structured_cv.get("full_name") or ""
+  # Seniority: try to extract from profile or work_experience
+  seniority = structured_cv.get("seniority") or ""
+  if not seniority:
+    # Try to infer from work_experience with month-accurate buckets
+    seniority = _seniority_from_jobs(jobs)
+  # Soft skills: from structured_cv["soft_skills"] or empty, limited to max 3
+  soft_skills = [str(s).strip() for s in (structured_cv.get("soft_skills") or []) if s][:3]
+  # Core skills: from structured_cv["core_skills"] or empty (same approach as soft_skills)
+  core_skills: List[str] = list(dict.fromkeys(str(s).strip() for s in (structured_cv.get("core_skills") or []) if s))
+
+  # Tech competencies:
+  # Use AI-based grouping for tech competencies (max 6 groups), with a simple
+  # heuristic fallback if the LLM is unavailable.
+  tech_competencies: Dict[str, List[str]] = {}
+  tech_competencies_flat: List[str] = []
+
+  # 1) Prefer pre-grouped skills if the caller already provided them.
+  if isinstance(structured_cv.get("skills_grouped"), dict):
+    for k, v in structured_cv["skills_grouped"].items():
+      group_name = str(k).strip()
+      if not group_name:
+        continue
+      values = [str(s).strip() for s in (v or []) if str(s).strip()]
+      if values:
+        tech_competencies[group_name] = values
+
+  # 2) Use static keyword-based grouping (fast, no AI calls)
+  if not tech_competencies:
+    skills = list(dict.fromkeys(str(s).strip() for s in (structured_cv.get("skills") or []) if s))
+    for skill in skills:
+      key = _categorize_skill(skill)
+      tech_competencies.setdefault(key, []).append(skill)
+
+  # Flatten for template: list of "Group: skill1, skill2"
+  # Dynamic limiting based on total character count to prevent overflow
+  sorted_groups = sorted(tech_competencies.items(), key=lambda x: (x[0] == "Other", x[0]))
+
+  groups = [(group, skills) for group, skills in sorted_groups if skills]
+
+  # Max 6 categories with 5 skills each; past 300 chars drop to 5 categories
+  # with 4 skills each, and past 400 chars to 4 categories.
+  tech_total = _skill_groups_length(groups[:6], 5)
+  if tech_total > 400:
+    tech_competencies_flat = _format_skill_groups(groups[:4], 4)
+  elif tech_total > 300:
+    tech_competencies_flat = _format_skill_groups(groups[:5], 4)
+  else:
+    tech_competencies_flat = _format_skill_groups(groups[:6], 5)
+  # Languages: join name+level, limit to max 3
+  languages = []
+  for lang in structured_cv.get("languages") or []:
+    if isinstance(lang, dict):
+      name_ = _field(lang, "name")
+      level_ = _field(lang, "level")
+      if name_:
+        languages.append(f"{name_} ({level_})" if level_ else name_)
+      if len(languages) >= 3:
+        break
+  # Education: show up to 3 entries, reduce if text is too long
+  education_items = []
+  education_list = structured_cv.get("education") or []
+  for e in education_list[:3]:
+    if isinstance(e, dict):
+      degree = str(e.get('degree', '')).strip()
+      institution = str(e.get('institution', '')).strip()
+      edu_str = f"{degree} {institution}".strip()
+      if edu_str:
+        education_items.append(edu_str)
+  # Dynamic limiting: past 200 chars keep 1 entry, past 150 keep 2
+  education = "\n".join(_limit_by_length(education_items, ((200, 1), (150, 2))))
+
+  # Trainings: show up to 3 entries, reduce if text is too long
+  all_trainings = []
+  for c in (structured_cv.get("certifications") or []):
+    if c:
+      all_trainings.append(str(c).strip())
+  for c in (structured_cv.get("courses") or []):
+    if c:
+      all_trainings.append(str(c).strip())
+  # Dynamic limiting: past 200 chars keep 1 entry, past 150 keep 2
+  trainings = "\n".join(_limit_by_length(all_trainings[:3], ((200, 1), (150, 2))))
+  # Recommendation: limit to 500 chars to prevent overflow
+  recommendation_raw = structured_cv.get("profile") or structured_cv.get("summary") or ""
+  if len(recommendation_raw) > 500:
+    # Cut at last complete sentence within 500 chars
+    sentences = _SENTENCE_SPLIT_RE.split(recommendation_raw)
+    # Joined with single spaces, so each sentence costs len + 1 (501 allows
+    # for the separator the last one doesn't get).
+    cut = _fit_prefix((len(sentence) + 1 for sentence in sentences), 501)
+    recommendation = " ".join(sentences[:cut]).strip()
+    # No complete sentence fits (single long sentence): hard cut at 497 + "..."
+    if not recommendation:
+      recommendation = recommendation_raw[:497] + "..."
+  else:
+    recommendation = recommendation_raw
+  # Project experience: include company name like in CV (latest 3 positions only)
+  # Dynamic limiting: reduce entries if text is too long
+  project_experience_items = []
+  for job in jobs[:3]:
+    # Format: "Title - Company (Period): bullets"
+    header = job.title or "Position"
+    if job.company:
+      header += f" - {job.company}"
+    if job.from_:
+      header += f" ({job.from_})"
+    bullets = job.bullets[:2]
+    if bullets:
+      bullets_text = "<br>".join(bullets)
+      project_experience_items.append(f"{header}: {bullets_text}")
+    else:
+      project_experience_items.append(header)
+
+  # Dynamic limiting: past 900 chars keep 2 entries; else show 3
+  project_experience_flat = _limit_by_length(project_experience_items, ((900, 2),))
+  # Footer logo absolute path (ensure visible in PDF)
+  footer_logo_url = _logo_uri(str(Path(settings.BASE_DIR) / "borek-logo" / "borek.jpeg")) or ""
+
+  # Compose context for template
+  return {
+    "name": name,
+    "seniority": seniority,
+    "core_skills": core_skills,
+    "soft_skills": soft_skills,
+    "languages": languages,
+    "education": education,
+    "trainings": trainings,
+    "recommendation": recommendation,
+    "tech_competencies_line": " | ".join(tech_competencies_flat),
+    "project_experience_line": " | ".join(project_experience_flat),
+    "footer_logo_url": footer_logo_url,
+    "cp_status": cp_status,
+  }
+
+
+def _standard_context(
+  structured_cv: Dict[str, Any],
+  jobs: List[_Job],
+  edu_entries: List[_Education],
+  project_entries: List[_Project],
+  html_template_path: Path,
+) -> Dict[str, Any]:
+  """Template context for the normal CV layout."""
+  profile_summary_raw = _field(structured_cv, "profile")
+  # Use same limit as competence template (550 chars)
+  sentences = [s for s in _SENTENCE_SPLIT_SPACES_RE.split(profile_summary_raw) if s.strip()]
+  cut = _fit_prefix(map(len, sentences), 550)
+  profile_summary = "\n".join(s.strip() for s in sentences[:cut])
+  if not profile_summary:
+      profile_summary = profile_summary_raw[:550]
+  languages: List[Dict[str, str]] = [
+    {"name": lang_name, "level": _field(lang, "level")}
+    for lang in structured_cv.get("languages") or []
+    if isinstance(lang, dict) and (lang_name := _field(lang, "name"))
+  ]
+  skills = _clean_strings(structured_cv.get("skills") or [])[:12]
+  experience: List[Dict[str, Any]] = [
+    {
+      "title": job.title,
+      "company": job.company,
+      "period": _period(job.from_, job.to, job.location),
+      "competence_bullets": [b[:220] for b in job.bullets[:4]],
+    }
+    for job in jobs
+  ]
+  education: List[Dict[str, str]] = [
+    {
+      "period": _join_nonempty(" - ", edu.from_, edu.to),
+      "degree": edu.degree,
+      "institution": edu.institution,
+    }
+    for edu in edu_entries
+  ]
+  projects: List[Dict[str, Any]] = [
+    {
+      "title": proj.title,
+      "company": proj.company,
+      "period": _period(proj.from_, proj.to, proj.location),
+      "competence_bullets": [b[:220] for b in proj.bullets[:4]],
+    }
+    for proj in project_entries
+  ]
+  courses = _clean_strings(structured_cv.get("courses") or [])
+  certifications = _clean_strings(structured_cv.get("certifications") or [])
+  # Logo is now in backend/borek-logo (same level as templates)
+  logo_src = _logo_uri(str(html_template_path.parent.parent / "borek-logo" / "borek.png"))
+  return {
+    "profile": {"summary": profile_summary},
+    "languages": languages,
+    "skills": skills,
+    "experience": experience,
+    "education": education,
+    "projects": projects,
+    "courses": courses,
+    "certifications": certifications,
+    "logo_src": logo_src,
+  }
+
+
+def _render_fpdf_fallback(
+  structured_cv: Dict[str, Any],
+  jobs: List[_Job],
+  edu_entries: List[_Education],
+  project_entries: List[_Project],
+) -> bytes:
+  """Deterministic FPDF layout, used when the HTML pipeline is unavailable or fails."""
   # FPDF fallback layout (Ajlla-inspired) if HTML pipeline is unavailable.
+  from fpdf import FPDF
+
   pdf = FPDF()
+  # Content streams are compressed by default. Pinning the creation date (it
+  # defaults to "now") makes the same CV render to byte-identical PDFs.
+  pdf.set_compression(True)
+  pdf.creation_date = _FPDF_CREATION_DATE
   pdf.set_auto_page_break(auto=True, margin=12)
   pdf.add_page()
 
   # Global font setup
   pdf.set_font("Helvetica", "", 11)
+  # Margins never change, so every bullet list shares one text width.
+  bullet_w = pdf.w - pdf.l_margin - pdf.r_margin - _BULLET_INDENT
 
   # Profile / headline section
-  profile = str(structured_cv.get("profile") or "").strip()
+  profile = _field(structured_cv, "profile")
   if profile:
     _pdf_add_section_title(pdf, "Profile")
     pdf.set_font("Helvetica", "", 11)
     _safe_multi_cell(pdf, 0, 6, profile)
 
   # Work Experience
-  work_experience = structured_cv.get("work_experience") or []
-  if isinstance(work_experience, list) and work_experience:
+  if jobs:
     _pdf_add_section_title(pdf, "Work Experience")
-    for job in work_experience:
-      if not isinstance(job, dict):
-        continue
-      title = str(job.get("title") or "").strip()
-      company = str(job.get("company") or "").strip()
-      location = str(job.get("location") or "").strip()
-      from_date = str(job.get("from") or "").strip()
-      to_date = str(job.get("to") or "").strip()
-      bullets = job.get("bullets") or []
-      if not isinstance(bullets, list):
-        bullets = []
-
+    for job in jobs:
       # Job header line
-      header_parts = [p for p in [title, company] if p]
-      header = " | ".join(header_parts) if header_parts else ""
-      dates = " - ".join([p for p in [from_date, to_date] if p])
+      header = _join_nonempty(" | ", job.title, job.company)
+      dates = _join_nonempty(" - ", job.from_, job.to)
 
       if header:
         _pdf_add_small_heading(pdf, header)
-      if dates or location:
+      if dates or job.location:
         pdf.set_font("Helvetica", "I", 9)
-        meta_parts = [dates, location]
-        meta = "  ·  ".join([p for p in meta_parts if p])
+        meta = _join_nonempty("  ·  ", dates, job.location)
         if meta:
           pdf.cell(0, 5, _sanitize_for_pdf(meta), ln=True)
 
       # Bullets
       pdf.set_font("Helvetica", "", 10)
-      for bullet in bullets:
-        if not isinstance(bullet, str):
-          continue
-        text = bullet.strip()
-        if not text:
-          continue
-        # Use ASCII-safe bullet to avoid Unicode font issues
-        # Start bullets on a fresh line with a small indent to guarantee width.
-        pdf.ln(0)
-        pdf.set_x(pdf.l_margin)
-        bullet_indent = 4
-        pdf.cell(bullet_indent, 5, "-")
-        pdf.set_x(pdf.l_margin + bullet_indent)
-        available_w = pdf.w - pdf.l_margin - pdf.r_margin - bullet_indent
-        _safe_multi_cell(pdf, available_w, 5, text)
+      for text in job.bullets:
+        _pdf_add_bullet(pdf, bullet_w, text)
       pdf.ln(1)
 
   # Certifications (placed immediately after Work Experience)
@@ -609,81 +844,40 @@ def render_structured_cv_to_pdf(
       text = cert.strip()
       if not text:
         continue
-      pdf.ln(0)
-      pdf.set_x(pdf.l_margin)
-      bullet_indent = 4
-      pdf.cell(bullet_indent, 5, "-")
-      pdf.set_x(pdf.l_margin + bullet_indent)
-      available_w = pdf.w - pdf.l_margin - pdf.r_margin - bullet_indent
-      _safe_multi_cell(pdf, available_w, 5, text)
+      _pdf_add_bullet(pdf, bullet_w, text)
 
   # Education
-  education = structured_cv.get("education") or []
-  if isinstance(education, list) and education:
+  if edu_entries:
     _pdf_add_section_title(pdf, "Education")
-    for edu in education:
-      if not isinstance(edu, dict):
-        continue
-      degree = str(edu.get("degree") or "").strip()
-      institution = str(edu.get("institution") or "").strip()
-      from_date = str(edu.get("from") or "").strip()
-      to_date = str(edu.get("to") or "").strip()
-
-      header_parts = [p for p in [degree, institution] if p]
-      header = " | ".join(header_parts) if header_parts else ""
-      dates = " - ".join([p for p in [from_date, to_date] if p])
+    for edu in edu_entries:
+      header = _join_nonempty(" | ", edu.degree, edu.institution)
+      dates = _join_nonempty(" - ", edu.from_, edu.to)
 
       if header:
         _pdf_add_small_heading(pdf, header)
       if dates:
         pdf.set_font("Helvetica", "I", 9)
         pdf.cell(0, 5, _sanitize_for_pdf(dates), ln=True)
-      pdf.set_font("Helvetica", "", 10)
       pdf.ln(1)
 
   # Projects
-  projects = structured_cv.get("projects") or []
-  if isinstance(projects, list) and projects:
+  if project_entries:
     _pdf_add_section_title(pdf, "Projects")
-    for project in projects:
-      if not isinstance(project, dict):
-        continue
-      title = str(project.get("title") or project.get("name") or "").strip()
-      company = str(project.get("company") or project.get("context") or "Personal Project").strip()
-      location = str(project.get("location") or "").strip()
-      from_date = str(project.get("from") or "").strip()
-      to_date = str(project.get("to") or "").strip()
-      bullets = project.get("bullets") or []
-      if not isinstance(bullets, list):
-        bullets = []
-
-      header_parts = [p for p in [title, company] if p]
-      header = " | ".join(header_parts) if header_parts else ""
-      dates = " - ".join([p for p in [from_date, to_date] if p])
+    for project in project_entries:
+      header = _join_nonempty(" | ", project.title, project.company or "Personal Project")
+      dates = _join_nonempty(" - ", project.from_, project.to)
 
       if header:
         _pdf_add_small_heading(pdf, header)
-      if dates or location:
+      if dates or project.location:
         pdf.set_font("Helvetica", "I", 9)
-        meta_parts = [dates, location]
-        meta = "  ·  ".join([p for p in meta_parts if p])
+        meta = _join_nonempty("  ·  ", dates, project.location)
         if meta:
           pdf.cell(0, 5, _sanitize_for_pdf(meta), ln=True)
 
       pdf.set_font("Helvetica", "", 10)
-      for bullet in bullets:
-        if not isinstance(bullet, str):
-          continue
-        text = bullet.strip()
-        if not text:
-          continue
-        pdf.ln(0)
-        pdf.set_x(pdf.l_margin)
-        bullet_indent = 4
-        pdf.cell(bullet_indent, 5, "-")
-        pdf.set_x(pdf.l_margin + bullet_indent)
-        available_w = pdf.w - pdf.l_margin - pdf.r_margin - bullet_indent
-        _safe_multi_cell(pdf, available_w, 5, text)
+      for text in project.bullets:
+        _pdf_add_bullet(pdf, bullet_w, text)
       pdf.ln(1)
 
   # Skills
@@ -707,13 +901,7 @@ def render_structured_cv_to_pdf(
       text = course.strip()
       if not text:
         continue
-      pdf.ln(0)
-      pdf.set_x(pdf.l_margin)
-      bullet_indent = 4
-      pdf.cell(bullet_indent, 5, "-")
-      pdf.set_x(pdf.l_margin + bullet_indent)
-      available_w = pdf.w - pdf.l_margin - pdf.r_margin - bullet_indent
-      _safe_multi_cell(pdf, available_w, 5, text)
+      _pdf_add_bullet(pdf, bullet_w, text)
 
   # Languages (placed last)
   languages: List[Dict[str, Any]] = []
@@ -727,15 +915,87 @@ def render_structured_cv_to_pdf(
     _pdf_add_section_title(pdf, "Languages")
     pdf.set_font("Helvetica", "", 11)
     for lang in languages:
-      name = str(lang.get("name") or "").strip()
-      level = str(lang.get("level") or "").strip()
+      name = _field(lang, "name")
+      level = _field(lang, "level")
       if not name:
         continue
       line = f"{name}: {level}" if level else name
       pdf.cell(0, 6, _sanitize_for_pdf(line), ln=True)
 
+  # fpdf2 always assembles the whole document in memory; without a name,
+  # output() hands that buffer back instead of writing a file.
+  return bytes(pdf.output())
+
+
+def render_structured_cv_to_pdf(
+  structured_cv: Dict[str, Any], *, output_path: Path, html_template_path: Optional[Path] = None, section_order: Optional[List[str]] = None, cp_status: str = ""
+) -> Path:
+  """
+  Render a normalized structured CV into a PDF file at `output_path`; see
+  `render_structured_cv_to_pdf_bytes` for the options.
+  """
+  pdf_bytes = render_structured_cv_to_pdf_bytes(
+    structured_cv, html_template_path=html_template_path, section_order=section_order, cp_status=cp_status
+  )
   output_path.parent.mkdir(parents=True, exist_ok=True)
-  pdf.output(str(output_path))
+  output_path.write_bytes(pdf_bytes)
   return output_path
 
 
+def render_structured_cv_to_pdf_bytes(
+  structured_cv: Dict[str, Any], *, html_template_path: Optional[Path] = None, section_order: Optional[List[str]] = None, cp_status: str = ""
+) -> bytes:
+  """
+  Render a normalized structured CV into PDF bytes, in memory.
+
+  If a Jinja2/WeasyPrint HTML template is provided and dependencies are installed,
+  render with that template to preserve the exact visual layout. Otherwise, fall
+  back to the deterministic FPDF layout below.
+  
+  `section_order` allows customizing the order and visibility of sections.
+  Missing sections use defaults; custom keys are ignored.
+  """
+
+  use_html = False
+  if not html_template_path:
+    logger.info("[PDF] No html_template_path provided; using FPDF fallback")
+  elif not _template_exists(html_template_path):
+    logger.warning("[PDF] Template not found at: %s; using FPDF fallback", html_template_path)
+  elif not load_html_backend():
+    logger.info("[PDF] HTML render deps unavailable; using FPDF fallback")
+  else:
+    use_html = True
+
+  normalized_order = _normalize_section_order(section_order)
+  jobs = _normalize_jobs(structured_cv.get("work_experience"))
+  edu_entries = _normalize_education(structured_cv.get("education"))
+  project_entries = _normalize_projects(structured_cv.get("projects"))
+
+  if use_html:
+    logger.debug("[PDF] Using HTML template: %s", html_template_path)
+    template = get_template(html_template_path)
+
+    # Detect if this is the competence template by filename
+    is_competence = "competence" in html_template_path.name.lower()
+
+    # Map structured_cv to competence template placeholders
+    if is_competence:
+      context = _competence_context(structured_cv, jobs, cp_status)
+      # WeasyPrint landscape workaround: use CSS @page { size: landscape; }
+      stylesheets = [landscape_stylesheet()]
+    else:
+      context = _standard_context(structured_cv, jobs, edu_entries, project_entries, html_template_path)
+      stylesheets = []
+
+    html_out = template.render(**context)
+    try:
+      pdf_bytes = HTML(string=html_out, url_fetcher=_url_fetcher).write_pdf(
+        stylesheets=stylesheets, font_config=font_config()
+      )
+      logger.debug("[PDF] HTML render completed%s", " (competence, landscape)" if is_competence else "")
+      return pdf_bytes
+    except Exception as exc:
+      logger.warning("[PDF] HTML render failed, falling back to FPDF: %s", exc, exc_info=True)
+
+  logger.debug("[PDF] Using FPDF fallback layout")
+  return _render_fpdf_fallback(structured_cv, jobs, edu_entries, project_entries)
@@ -0,0 +1,116 @@
+"""
+Process pool for CPU-bound PDF rendering.
+
+WeasyPrint layout runs in Python and holds the GIL, so with threaded workers
+concurrent renders in one process run one at a time. Handing renders to a
+small pool of worker processes lets several PDFs render in parallel, and each
+worker pays the WeasyPrint import, Jinja template compilation and font setup
+once, in its initializer, instead of on the first request it serves.
+
+Like the parse pool, the pool is created lazily on first use and uses the
+"spawn" start method; the PDF comes back through the pool's pipe.
+CV_RENDER_WORKERS defaults to 0 (render in-process): every worker holds its
+own copy of WeasyPrint, per web worker.
+"""
+
+import logging
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+
+class RenderTimeoutError(RuntimeError):
+    """Raised when a pool worker takes longer than CV_RENDER_TIMEOUT seconds."""
+
+
+_executor: Optional[ProcessPoolExecutor] = None
+_executor_lock = threading.Lock()
+
+
+def _init_worker() -> None:
+    """Set up Django and warm the HTML backend once per worker process."""
+    import django
+
+    django.setup()
+
+    from .pdf_renderer import warm_html_backend
+
+    warm_html_backend()
+
+
+def _get_executor() -> Optional[ProcessPoolExecutor]:
+    global _executor
+    workers = getattr(settings, "CV_RENDER_WORKERS", 0)
+    if workers <= 0:
+        return None
+    with _executor_lock:
+        if _executor is None:
+            _executor = ProcessPoolExecutor(
+                max_workers=workers,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_init_worker,
+            )
+        return _executor
+
+
+def _reset_executor() -> None:
+    global _executor
+    with _executor_lock:
+        if _executor is not None:
+            _executor.shutdown(wait=False, cancel_futures=True)
+        _executor = None
+
+
+def render_pdf_bytes(structured_cv: Dict[str, Any], kwargs: Dict[str, Any]) -> bytes:
+    """Worker entry point: render one structured CV and return the PDF bytes."""
+    from .pdf_renderer import render_structured_cv_to_pdf_bytes
+
+    return render_structured_cv_to_pdf_bytes(structured_cv, **kwargs)
+
+
+def render_structured_cv_to_pdf_bytes_in_pool(
+    structured_cv: Dict[str, Any],
+    *,
+    html_template_path: Optional[Path] = None,
+    section_order: Optional[List[str]] = None,
+    cp_status: str = "",
+) -> bytes:
+    """
+    Same contract as `render_structured_cv_to_pdf_bytes`, but runs the render
+    in the process pool.
+
+    Falls back to in-process rendering when the pool is disabled or broken.
+    Raises `RenderTimeoutError` when a worker doesn't finish within
+    CV_RENDER_TIMEOUT seconds; rendering the same input in-process would
+    most likely hang the request thread instead.
+    """
+    kwargs = {
+        "html_template_path": html_template_path,
+        "section_order": section_order,
+        "cp_status": cp_status,
+    }
+    executor = _get_executor()
+    if executor is None:
+        return render_pdf_bytes(structured_cv, kwargs)
+
+    timeout = getattr(settings, "CV_RENDER_TIMEOUT", 60)
+    try:
+        return executor.submit(render_pdf_bytes, structured_cv, kwargs).result(timeout)
+    except TimeoutError:
+        # A running task can't be cancelled; start a fresh pool so later renders
+        # don't queue behind the stuck worker.
+        logger.warning("[RENDER_POOL] worker timed out after %ss", timeout)
+        _reset_executor()
+        raise RenderTimeoutError(f"PDF rendering did not finish within {timeout}s.")
+    except BrokenProcessPool:
+        logger.warning("[RENDER_POOL] worker pool broken; rendering in-process", exc_info=True)
+        _reset_executor()
+        return render_pdf_bytes(structured_cv, kwargs)
+
@@ -1,3 +1,7 @@
+import hashlib
+
+from django.db.models import CharField, F, Value
+from django.db.models.functions import Coalesce, Concat, NullIf, Trim
 from rest_framework import serializers
 
 from .models import CV
@@ -21,19 +25,61 @@ class CVSerializer(serializers.ModelSerializer):
         extra_kwargs = {'file': {'write_only': True}}
 
     def get_uploaded_by(self, obj: CV) -> str:
+        # List querysets annotate the name (see uploader_name_expression);
+        # single instances, e.g. right after upload, fall back to the user.
+        annotated = getattr(obj, "uploaded_by_name", None)
+        if annotated is not None:
+            return annotated
+
         user = getattr(obj, "user", None)
         if not user:
             return ""
 
-        full_name = (getattr(user, "first_name", "") + " " + getattr(user, "last_name", "")).strip()
-        return full_name or getattr(user, "email", "") or ""
+        full_name = f"{user.first_name} {user.last_name}".strip()
+        return full_name or user.email or ""
 
     def create(self, validated_data):
         request = self.context['request']
         uploaded_file = validated_data['file']
+        content_sha256 = _sha256_of(uploaded_file)
+
+        # The user stored identical bytes before: point at the existing blob
+        # instead of uploading again, and reuse its extracted text. Dedupe
+        # never crosses users, so nobody shares another user's file or text.
+        existing = (
+            CV.objects.filter(user=request.user, content_sha256=content_sha256)
+            .exclude(file='')
+            .only('file', 'extracted_text', 'text_extracted_at')
+            .first()
+        )
+        if existing is not None:
+            validated_data['file'] = existing.file.name
+            validated_data['extracted_text'] = existing.extracted_text
+            validated_data['text_extracted_at'] = existing.text_extracted_at
+
         return CV.objects.create(
             user=request.user,
             original_filename=uploaded_file.name,
+            content_sha256=content_sha256,
             **validated_data,
         )
 
+
+def uploader_name_expression():
+    """
+    Database expression matching ``CVSerializer.get_uploaded_by``: the
+    uploader's "first last" name, or their email when both are blank.
+    """
+    full_name = Trim(Concat(F("user__first_name"), Value(" "), F("user__last_name")))
+    return Coalesce(
+        NullIf(full_name, Value("")), F("user__email"), Value(""), output_field=CharField()
+    )
+
+
+def _sha256_of(uploaded_file) -> str:
+    digest = hashlib.sha256()
+    for chunk in uploaded_file.chunks():
+        digest.update(chunk)
+    uploaded_file.seek(0)
+    return digest.hexdigest()
+
@@ -1,16 +1,21 @@
+import functools
 import io
 import logging
-import mimetypes
 import os
 import time
-from typing import BinaryIO, Optional
+from typing import BinaryIO, List, Optional
 
 from django.core.files import File
+from django.core.files.uploadedfile import UploadedFile
 from django.utils import timezone
 
 logger = logging.getLogger(__name__)
 
 
+class CVTooLargeError(ValueError):
+    """Raised when a CV exceeds the configured parsing limits."""
+
+
 def _normalize_text(text: str) -> str:
     """
     Basic cleanup for extracted text.
@@ -40,21 +45,114 @@ def _normalize_text(text: str) -> str:
     return "\n".join(cleaned_lines).strip()
 
 
-def read_pdf(file_obj: BinaryIO) -> str:
-    """
-    Extract text from a PDF file-like object using PyPDF2.
+def _pdf_pages_pymupdf(pymupdf, fp: BinaryIO, max_pages: Optional[int]) -> List[str]:
+    document = pymupdf.open(stream=fp.read(), filetype="pdf")
+    try:
+        if max_pages and document.page_count > max_pages:
+            raise CVTooLargeError(
+                f"PDF has {document.page_count} pages; the limit is {max_pages}."
+            )
+        text_chunks = []
+        for page in document:
+            try:
+                page_text = page.get_text() or ""
+            except Exception:
+                # Ignore problematic pages rather than failing the whole document
+                page_text = ""
+            if page_text:
+                text_chunks.append(page_text)
+        return text_chunks
+    finally:
+        document.close()
+
+
+def _pdf_pages_pypdfium2(pdfium, fp: BinaryIO, max_pages: Optional[int]) -> List[str]:
+    document = pdfium.PdfDocument(fp.read())
+    try:
+        page_count = len(document)
+        if max_pages and page_count > max_pages:
+            raise CVTooLargeError(
+                f"PDF has {page_count} pages; the limit is {max_pages}."
+            )
+        text_chunks = []
+        for index in range(page_count):
+            page = document[index]
+            try:
+                textpage = page.get_textpage()
+                try:
+                    page_text = textpage.get_text_range() or ""
+                finally:
+                    textpage.close()
+            except Exception:
+                # Ignore problematic pages rather than failing the whole document
+                page_text = ""
+            finally:
+                page.close()
+            if page_text:
+                text_chunks.append(page_text)
+        return text_chunks
+    finally:
+        document.close()
+
+
+def _pdf_pages_pypdf2(PyPDF2, fp: BinaryIO, max_pages: Optional[int]) -> List[str]:
+    reader = PyPDF2.PdfReader(fp)
+    if max_pages and len(reader.pages) > max_pages:
+        raise CVTooLargeError(
+            f"PDF has {len(reader.pages)} pages; the limit is {max_pages}."
+        )
+    text_chunks = []
 
-    `file_obj` can be:
-      - a Django `File` / `FieldFile` instance
-      - any binary file-like object opened in 'rb' mode
+    for page in reader.pages:
+        try:
+            page_text = page.extract_text() or ""
+        except Exception:
+            # Ignore problematic pages rather than failing the whole document
+            page_text = ""
+        if page_text:
+            text_chunks.append(page_text)
+    return text_chunks
+
+
+@functools.cache
+def _pdf_text_extractor():
     """
+    The fastest installed PDF text extractor: PyMuPDF (AGPL), then
+    pypdfium2 (Apache-2.0), both native, then the pure-Python PyPDF2.
+    """
+    try:
+        import pymupdf
+        return functools.partial(_pdf_pages_pymupdf, pymupdf)
+    except ImportError:
+        pass
+    try:
+        import pypdfium2
+        return functools.partial(_pdf_pages_pypdfium2, pypdfium2)
+    except ImportError:
+        pass
     try:
         import PyPDF2
     except ImportError as exc:
         raise ImportError(
-            "PyPDF2 must be installed to parse PDF files. "
-            "Install it with 'pip install PyPDF2'."
+            "PyMuPDF, pypdfium2 or PyPDF2 must be installed to parse PDF files. "
+            "Install one with e.g. 'pip install PyPDF2'."
         ) from exc
+    return functools.partial(_pdf_pages_pypdf2, PyPDF2)
+
+
+def read_pdf(file_obj: BinaryIO, *, max_pages: Optional[int] = None) -> str:
+    """
+    Extract text from a PDF file-like object with the fastest installed
+    backend (see `_pdf_text_extractor`).
+
+    `file_obj` can be:
+      - a Django `File` / `FieldFile` instance
+      - any binary file-like object opened in 'rb' mode
+
+    If `max_pages` is given, documents with more pages raise `CVTooLargeError`
+    before any page text is extracted.
+    """
+    extract_pages = _pdf_text_extractor()
 
     # Ensure we are working with a raw file-like object
     if isinstance(file_obj, File):
@@ -69,17 +167,7 @@ def read_pdf(file_obj: BinaryIO) -> str:
         pass
 
     t_parse = time.monotonic()
-    reader = PyPDF2.PdfReader(fp)
-    text_chunks = []
-
-    for page in reader.pages:
-        try:
-            page_text = page.extract_text() or ""
-        except Exception:
-            # Ignore problematic pages rather than failing the whole document
-            page_text = ""
-        if page_text:
-            text_chunks.append(page_text)
+    text_chunks = extract_pages(fp, max_pages)
 
     joined = "\n\n".join(text_chunks)
     logger.info(
@@ -136,6 +224,13 @@ def read_docx(file_obj: BinaryIO) -> str:
     return out
 
 
+_EXTENSION_TYPES = {".pdf": "pdf", ".docx": "docx"}
+# Checked in order; "word" also covers the
+# "officedocument.wordprocessingml.document" DOCX MIME type.
+_CONTENT_TYPE_MARKERS = (("pdf", "pdf"), ("word", "docx"))
+
+
+@functools.lru_cache(maxsize=256)
 def guess_file_type(
     name: Optional[str] = None,
     content_type: Optional[str] = None,
@@ -148,28 +243,13 @@ def guess_file_type(
     # 1) Explicit content_type if provided
     if content_type:
         lc_type = content_type.lower()
-        if "pdf" in lc_type:
-            return "pdf"
-        if "word" in lc_type or "officedocument.wordprocessingml.document" in lc_type:
-            return "docx"
+        for marker, file_type in _CONTENT_TYPE_MARKERS:
+            if marker in lc_type:
+                return file_type
 
     # 2) Fallback to extension from name
     if name:
-        ext = os.path.splitext(name)[1].lower()
-        if ext == ".pdf":
-            return "pdf"
-        if ext == ".docx":
-            return "docx"
-
-    # 3) Last resort: let mimetypes guess from the name
-    if name:
-        guessed_type, _ = mimetypes.guess_type(name)
-        if guessed_type:
-            guessed_type = guessed_type.lower()
-            if "pdf" in guessed_type:
-                return "pdf"
-            if "word" in guessed_type or "officedocument.wordprocessingml.document" in guessed_type:
-                return "docx"
+        return _EXTENSION_TYPES.get(os.path.splitext(name)[1].lower())
 
     return None
 
@@ -180,10 +260,14 @@ def get_or_extract_cv_text(cv_instance) -> str:
     Falls back to read_cv_file() + persists on miss (first access after upload
     for new CVs, or first access after deploy for pre-existing CVs).
     """
-    try:
-        cv_instance.refresh_from_db(fields=["extracted_text", "text_extracted_at"])
-    except Exception:
-        pass
+    # Only hit the DB again when the caller loaded the row without the cache
+    # columns; a freshly fetched instance already carries them.
+    deferred = {"extracted_text", "text_extracted_at"} & cv_instance.get_deferred_fields()
+    if deferred:
+        try:
+            cv_instance.refresh_from_db(fields=sorted(deferred))
+        except Exception:
+            pass
 
     # Use text_extracted_at so legitimately empty extraction is still cached
     # (truthy check on extracted_text alone would re-fetch forever for "").
@@ -193,7 +277,6 @@ def get_or_extract_cv_text(cv_instance) -> str:
             f"chars={len(cv_instance.extracted_text or '')}"
         )
         logger.info(msg)
-        print(msg)
         return cv_instance.extracted_text or ""
 
     file_obj = cv_instance.file
@@ -209,16 +292,23 @@ def get_or_extract_cv_text(cv_instance) -> str:
     cv_instance.save(update_fields=["extracted_text", "text_extracted_at"])
     msg = f"[CV_TEXT_CACHE] Populated extracted_text for cv_id={cv_instance.id} chars={len(text)}"
     logger.info(msg)
-    print(msg)
     return text
 
 
-def read_cv_file(file_obj: BinaryIO, *, name: Optional[str] = None, content_type: Optional[str] = None) -> str:
+def read_cv_file(
+    file_obj: BinaryIO,
+    *,
+    name: Optional[str] = None,
+    content_type: Optional[str] = None,
+    max_pages: Optional[int] = None,
+) -> str:
     """
     Convenience helper that:
       1. Determines the file type (pdf/docx) from name/content_type.
       2. Dispatches to the appropriate parser.
 
+    `max_pages` is forwarded to `read_pdf` to reject oversized PDFs early.
+
     Example usage with a `CV` instance:
 
         cv = CV.objects.first()
@@ -226,16 +316,17 @@ def read_cv_file(file_obj: BinaryIO, *, name: Optional[str] = None, content_type
     """
     file_label = name or "unknown"
 
-    # --- LOGGING: Verify file source (Cloudinary vs local disk) ---
-    try:
-        # Try to get the URL if it exists (Cloudinary/S3 files have this)
-        file_url = getattr(file_obj, 'url', 'No URL attribute')
-        print(f"[FILE LOAD] Reading CV from: {file_url}")
-        print(f"[FILE LOAD] File name: {name}")
-        print(f"[FILE LOAD] File object type: {type(file_obj)}")
-    except Exception as e:
-        print(f"[FILE LOAD] Could not determine URL: {e}")
-    # --------------------------------------------------------------
+    # Verify the file source (Cloudinary vs local disk) when debugging; the
+    # storage URL is only built if the record will actually be emitted.
+    if logger.isEnabledFor(logging.DEBUG):
+        try:
+            # Cloudinary/S3 files have a URL; local uploads do not
+            file_url = getattr(file_obj, "url", None)
+        except Exception:
+            file_url = None
+        logger.debug(
+            "[FILE LOAD] Reading CV name=%r url=%s type=%s", name, file_url, type(file_obj).__name__
+        )
 
     t0 = time.monotonic()
     file_type = guess_file_type(name=name, content_type=content_type)
@@ -261,15 +352,23 @@ def read_cv_file(file_obj: BinaryIO, *, name: Optional[str] = None, content_type
         f"[TIMING] file={file_label!r} stage=file_open seconds={time.monotonic() - t0:.3f}"
     )
 
-    t0 = time.monotonic()
-    raw_bytes = fp.read()
-    logger.info(
-        f"[TIMING] file={file_label!r} stage=file_read bytes={len(raw_bytes)} seconds={time.monotonic() - t0:.3f}"
-    )
-    stream = io.BytesIO(raw_bytes)
+    if isinstance(file_obj, UploadedFile):
+        # Request uploads are already local (in memory or spooled to a temp
+        # file), so parsers can read pages straight from them without another
+        # full in-memory copy.
+        stream = fp
+    else:
+        # Storage-backed files (Cloudinary) are fetched in one bulk read so the
+        # parsers' many small seeks don't turn into remote range requests.
+        t0 = time.monotonic()
+        raw_bytes = fp.read()
+        logger.info(
+            f"[TIMING] file={file_label!r} stage=file_read bytes={len(raw_bytes)} seconds={time.monotonic() - t0:.3f}"
+        )
+        stream = io.BytesIO(raw_bytes)
 
     if file_type == "pdf":
-        return read_pdf(stream)
+        return read_pdf(stream, max_pages=max_pages)
     return read_docx(stream)
 
 
@@ -8,7 +8,10 @@ from .models import CV
 def delete_cv_file_from_cloudinary(sender, instance, **kwargs):
     """
     Deletes the file from Cloudinary when the CV instance is deleted.
+
+    Uploads are content-addressed per user, so the blob is kept while
+    another of the user's CV rows still references it.
     """
-    if instance.file:
+    if instance.file and not CV.objects.filter(file=instance.file.name).exists():
         # Pass save=False to avoid saving the model instance while trying to delete it
         instance.file.delete(save=False)
@@ -1,14 +1,44 @@
+import io
 import shutil
 import tempfile
 
+from datetime import date
+from pathlib import Path
+from unittest import mock
+
 from django.contrib.auth import get_user_model
+from django.core.cache import cache
 from django.core.files.uploadedfile import SimpleUploadedFile
-from django.test import override_settings
+from django.test import SimpleTestCase, override_settings
 from django.urls import reverse
+from django.utils import timezone
 from rest_framework import status
 from rest_framework.test import APITestCase
 
+from . import parse_pool, render_pool
 from .models import CV
+from .services import guess_file_type
+from .pdf_renderer import (
+    _SKILL_CATEGORY_KEYWORDS,
+    _calculate_seniority_label,
+    _categorize_skill,
+    _clean_strings,
+    _field,
+    _fit_prefix,
+    _format_skill_groups,
+    _join_nonempty,
+    _limit_by_length,
+    _normalize_education,
+    _normalize_jobs,
+    _normalize_projects,
+    _normalize_section_order,
+    _parse_date,
+    _period,
+    _sanitize_for_pdf,
+    _skill_groups_length,
+    DEFAULT_SECTION_ORDER,
+    render_structured_cv_to_pdf,
+)
 
 
 class CVUploadViewTests(APITestCase):
@@ -46,6 +76,50 @@ class CVUploadViewTests(APITestCase):
         self.assertEqual(response.data['original_filename'], 'resume.pdf')
         self.assertEqual(CV.objects.filter(user=self.user).count(), 1)
 
+    def test_identical_upload_reuses_stored_file(self):
+        content = b'%PDF-1.4 shared file'
+        first = self.client.post(
+            self.url,
+            {'file': SimpleUploadedFile('a.pdf', content, content_type='application/pdf')},
+            format='multipart',
+        )
+        second = self.client.post(
+            self.url,
+            {'file': SimpleUploadedFile('b.pdf', content, content_type='application/pdf')},
+            format='multipart',
+        )
+
+        self.assertEqual(first.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(second.status_code, status.HTTP_201_CREATED)
+        cv_a = CV.objects.get(pk=first.data['id'])
+        cv_b = CV.objects.get(pk=second.data['id'])
+        self.assertEqual(cv_a.content_sha256, cv_b.content_sha256)
+        self.assertEqual(cv_a.file.name, cv_b.file.name)
+        self.assertEqual(cv_b.original_filename, 'b.pdf')
+
+    def test_identical_upload_by_another_user_is_stored_separately(self):
+        content = b'%PDF-1.4 shared file'
+        first = self.client.post(
+            self.url,
+            {'file': SimpleUploadedFile('a.pdf', content, content_type='application/pdf')},
+            format='multipart',
+        )
+        other = get_user_model().objects.create_user(
+            email='other@example.com',
+            password='Passw0rd!',
+        )
+        self.client.force_authenticate(other)
+        second = self.client.post(
+            self.url,
+            {'file': SimpleUploadedFile('b.pdf', content, content_type='application/pdf')},
+            format='multipart',
+        )
+
+        cv_a = CV.objects.get(pk=first.data['id'])
+        cv_b = CV.objects.get(pk=second.data['id'])
+        self.assertNotEqual(cv_a.file.name, cv_b.file.name)
+        self.assertIsNone(cv_b.text_extracted_at)
+
     def test_rejects_invalid_file_extension(self):
         file = SimpleUploadedFile(
             'resume.txt',
@@ -69,3 +143,264 @@ class CVUploadViewTests(APITestCase):
         response = self.client.post(self.url, {'file': file}, format='multipart')
 
         self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+
+class FormattedCVViewTests(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.addCleanup(cache.clear)
+        self.user = get_user_model().objects.create_user(
+            email='formatted@example.com',
+            password='Passw0rd!',
+        )
+        self.client.force_authenticate(self.user)
+        self.cv = CV.objects.create(
+            user=self.user,
+            file='cvs/resume.pdf',
+            original_filename='resume.pdf',
+            extracted_text='Ada Lovelace, engineer',
+            text_extracted_at=timezone.now(),
+        )
+
+    def test_repeat_download_reuses_structured_cv(self):
+        url = reverse('cv:formatted', args=[self.cv.pk])
+        with mock.patch('apps.cv.views.generate_structured_cv', return_value={'name': 'Ada'}) as llm, \
+                mock.patch('apps.cv.views.render_structured_cv_to_pdf_bytes_in_pool', return_value=b'%PDF-1.7') as render:
+            first = self.client.get(url)
+            second = self.client.get(url)
+
+        self.assertEqual(first.status_code, status.HTTP_200_OK)
+        self.assertEqual(second.content, b'%PDF-1.7')
+        llm.assert_called_once()
+        self.assertEqual(render.call_count, 2)
+
+    def test_empty_structured_cv_is_not_cached(self):
+        url = reverse('cv:formatted', args=[self.cv.pk])
+        with mock.patch('apps.cv.views.generate_structured_cv', return_value={'profile': '', 'skills': []}) as llm, \
+                mock.patch('apps.cv.views.render_structured_cv_to_pdf_bytes_in_pool', return_value=b'%PDF-1.7'):
+            self.client.get(url)
+            self.client.get(url)
+
+        self.assertEqual(llm.call_count, 2)
+
+
+class GuessFileTypeTests(SimpleTestCase):
+    def test_content_type_wins_over_extension(self):
+        self.assertEqual(guess_file_type("cv.docx", "application/pdf"), "pdf")
+        docx_type = "application/vnd.openxmlformats-officedocument.wordprocessingml.document"
+        self.assertEqual(guess_file_type("cv.pdf", docx_type), "docx")
+
+    def test_extension_fallback(self):
+        self.assertEqual(guess_file_type("CV.PDF", "application/octet-stream"), "pdf")
+        self.assertEqual(guess_file_type(name="cv.docx"), "docx")
+        self.assertIsNone(guess_file_type(name="cv.doc"))
+        self.assertIsNone(guess_file_type())
+
+
+class CategorizeSkillTests(SimpleTestCase):
+    def test_matches_substring_keyword_scan(self):
+        def reference(skill):
+            lower = skill.lower()
+            for category, keywords in _SKILL_CATEGORY_KEYWORDS:
+                if any(x in lower for x in keywords):
+                    return category
+            return "Other"
+
+        skills = ["Python", "ReactJS", "PostgreSQL", "Docker", "Scrum", "Excel", "Google Cloud", "C#/.NET"]
+        for skill in skills:
+            with self.subTest(skill=skill):
+                self.assertEqual(_categorize_skill(skill), reference(skill))
+
+    def test_category_order_wins(self):
+        # "django" and "sql" both match; backend is checked first.
+        self.assertEqual(_categorize_skill("Django ORM / SQL"), "Backend Development")
+        self.assertEqual(_categorize_skill("Excel"), "Other")
+
+
+class NormalizeJobsTests(SimpleTestCase):
+    def test_drops_invalid_entries_and_cleans_fields(self):
+        jobs = _normalize_jobs([
+            "not a job",
+            {"title": " Dev ", "company": None, "from": "2020-01", "bullets": [" Built X ", "", 3]},
+            {"title": "Ops", "bullets": "not a list"},
+        ])
+
+        self.assertEqual(len(jobs), 2)
+        self.assertEqual(jobs[0].title, "Dev")
+        self.assertEqual(jobs[0].company, "")
+        self.assertEqual(jobs[0].from_, "2020-01")
+        self.assertEqual(jobs[0].bullets, ("Built X",))
+        self.assertEqual(jobs[1].bullets, ())
+
+    def test_field_takes_first_truthy_key(self):
+        entry = {"title": "", "name": " Portal ", "from": 2020, "to": None}
+        self.assertEqual(_field(entry, "title", "name"), "Portal")
+        self.assertEqual(_field(entry, "from"), "2020")
+        self.assertEqual(_field(entry, "to"), "")
+        self.assertEqual(_field(entry, "missing"), "")
+
+    def test_join_nonempty_skips_blank_parts(self):
+        self.assertEqual(_join_nonempty(" - ", "2020", ""), "2020")
+        self.assertEqual(_join_nonempty(" | ", "Dev", "Acme"), "Dev | Acme")
+        self.assertEqual(_join_nonempty(" | ", "", ""), "")
+
+    def test_clean_strings_and_period(self):
+        self.assertEqual(_clean_strings([" Python ", "", None, 3, "  "]), ["Python"])
+        self.assertEqual(_period("2020", "2022", "Berlin"), "2020 - 2022 · Berlin")
+        self.assertEqual(_period("", "", "Berlin"), "Berlin")
+        self.assertEqual(_period("2020", ""), "2020")
+
+    def test_normalizes_education_and_projects(self):
+        self.assertEqual(_normalize_education("bad"), [])
+        edu = _normalize_education([{"degree": " BSc ", "from": "2015"}, "junk"])
+        self.assertEqual(len(edu), 1)
+        self.assertEqual((edu[0].degree, edu[0].from_, edu[0].to), ("BSc", "2015", ""))
+
+        projects = _normalize_projects([
+            {"name": "Portal", "context": "Acme", "bullets": [" Built it ", ""]},
+            {"title": "Tool", "bullets": "not a list"},
+        ])
+        self.assertEqual((projects[0].title, projects[0].company), ("Portal", "Acme"))
+        self.assertEqual(projects[0].bullets, ("Built it",))
+        self.assertEqual(projects[1].bullets, ())
+
+    def test_seniority_label(self):
+        self.assertEqual(_calculate_seniority_label(None), "")
+        self.assertEqual(
+            _calculate_seniority_label([{"from": "2015-01", "to": "2021-01"}]),
+            "Senior",
+        )
+        self.assertEqual(
+            _calculate_seniority_label([{"from": "2020-01", "to": "2021-01"}]),
+            "Junior",
+        )
+
+
+class ParseDateTests(SimpleTestCase):
+    def test_supported_shapes(self):
+        self.assertEqual(_parse_date("2020-03-15"), date(2020, 3, 15))
+        self.assertEqual(_parse_date("2020/3/5"), date(2020, 3, 5))
+        self.assertEqual(_parse_date(" 2020-03 "), date(2020, 3, 1))
+        self.assertEqual(_parse_date("2020"), date(2020, 1, 1))
+
+    def test_partial_or_invalid_input_falls_back(self):
+        self.assertEqual(_parse_date("2021-02-30"), date(2021, 2, 1))
+        self.assertEqual(_parse_date("2020-13"), date(2020, 12, 1))
+        self.assertEqual(_parse_date("2020-03-15T10:00"), date(2020, 3, 1))
+        self.assertIsNone(_parse_date("Present"))
+        self.assertIsNone(_parse_date(None))
+
+    def test_matches_int_fallback_for_short_or_signed_years(self):
+        self.assertEqual(_parse_date("7"), date(7, 1, 1))
+        self.assertEqual(_parse_date("+202"), date(202, 1, 1))
+        self.assertEqual(_parse_date("+202-05"), date(202, 5, 1))
+        self.assertIsNone(_parse_date("-202"))
+        self.assertIsNone(_parse_date("0000-01-01"))
+
+    def test_accepts_space_padded_day_like_strptime(self):
+        self.assertEqual(_parse_date("2020-03- 5"), date(2020, 3, 5))
+        self.assertEqual(_parse_date("2020-03- 15"), date(2020, 3, 1))
+
+
+class LimitByLengthTests(SimpleTestCase):
+    def test_first_exceeded_tier_wins(self):
+        tiers = ((200, 1), (150, 2))
+        self.assertEqual(_limit_by_length(["a" * 50] * 3, tiers), ["a" * 50] * 3)
+        self.assertEqual(_limit_by_length(["a" * 60] * 3, tiers), ["a" * 60] * 2)
+        self.assertEqual(_limit_by_length(["a" * 70] * 3, tiers), ["a" * 70])
+
+
+class FitPrefixTests(SimpleTestCase):
+    def test_counts_items_within_running_limit(self):
+        self.assertEqual(_fit_prefix([200, 200, 200], 500), 2)
+        self.assertEqual(_fit_prefix([200, 300, 1], 500), 2)
+        self.assertEqual(_fit_prefix([600, 10], 500), 0)
+        self.assertEqual(_fit_prefix([], 500), 0)
+
+
+class SkillGroupsLengthTests(SimpleTestCase):
+    def test_matches_formatted_length(self):
+        groups = [("Backend", ["Python", "Django", "Go"]), ("Other", ["Excel"]), ("Empty", [])]
+        for max_skills in (1, 2, 5):
+            with self.subTest(max_skills=max_skills):
+                self.assertEqual(
+                    _skill_groups_length(groups, max_skills),
+                    sum(map(len, _format_skill_groups(groups, max_skills))),
+                )
+
+
+class NormalizeSectionOrderTests(SimpleTestCase):
+    def test_known_keys_first_then_missing_defaults(self):
+        order = _normalize_section_order([" Skills", "bogus", "skills", 3, "EDUCATION"])
+        self.assertEqual(order[:2], ["skills", "education"])
+        self.assertEqual(sorted(order), sorted(DEFAULT_SECTION_ORDER))
+
+    def test_empty_input_returns_defaults(self):
+        self.assertEqual(_normalize_section_order(None), DEFAULT_SECTION_ORDER)
+
+
+class SanitizeForPdfTests(SimpleTestCase):
+    def test_drops_characters_outside_latin1(self):
+        self.assertEqual(_sanitize_for_pdf("plain ascii"), "plain ascii")
+        self.assertEqual(_sanitize_for_pdf("Zürich ✓ café"), "Zürich  café")
+        self.assertEqual(_sanitize_for_pdf("“Lead” – 2020…"), '"Lead" - 2020...')
+        self.assertEqual(_sanitize_for_pdf(None), "")
+
+    def test_drops_control_characters_but_keeps_whitespace(self):
+        self.assertEqual(_sanitize_for_pdf("a\x00b\x07c"), "abc")
+        self.assertEqual(_sanitize_for_pdf("line\none\ttab"), "line\none\ttab")
+        self.assertEqual(_sanitize_for_pdf("caf\xe9\x9d"), "caf\xe9")
+
+
+@override_settings(CV_PARSE_TIMEOUT=5)
+class ParsePoolTests(SimpleTestCase):
+    def test_timed_out_worker_falls_back_to_in_process_parse(self):
+        executor = mock.Mock()
+        executor.submit.return_value.result.side_effect = TimeoutError
+        with mock.patch.object(parse_pool, "_get_executor", return_value=executor), \
+                mock.patch.object(parse_pool, "_reset_executor") as reset, \
+                mock.patch.object(parse_pool, "parse_bytes", return_value="text") as parse:
+            text = parse_pool.read_cv_file_in_pool(io.BytesIO(b"data"), name="cv.pdf")
+
+        self.assertEqual(text, "text")
+        executor.submit.return_value.result.assert_called_once_with(5)
+        reset.assert_called_once()
+        parse.assert_called_once_with(b"data", "cv.pdf", None, None)
+
+
+@override_settings(CV_RENDER_WORKERS=0)
+class RenderBytesTests(SimpleTestCase):
+    def test_bytes_render_runs_in_process_without_pool(self):
+        with mock.patch.object(render_pool, "render_pdf_bytes", return_value=b"%PDF-1.7") as render:
+            pdf_bytes = render_pool.render_structured_cv_to_pdf_bytes_in_pool(
+                {"name": "A"}, html_template_path=Path("t.html"), cp_status="open"
+            )
+
+        self.assertEqual(pdf_bytes, b"%PDF-1.7")
+        self.assertEqual(render.call_args.args[1]["cp_status"], "open")
+        self.assertNotIn("output_path", render.call_args.args[1])
+
+    def test_path_render_writes_rendered_bytes(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            output_path = Path(tmpdir) / "out" / "cv.pdf"
+            with mock.patch(
+                "apps.cv.pdf_renderer.render_structured_cv_to_pdf_bytes", return_value=b"%PDF-1.7"
+            ):
+                result = render_structured_cv_to_pdf({"name": "A"}, output_path=output_path)
+
+            self.assertEqual(result, output_path)
+            self.assertEqual(output_path.read_bytes(), b"%PDF-1.7")
+
+    @override_settings(CV_RENDER_TIMEOUT=5)
+    def test_timed_out_worker_resets_pool_and_raises(self):
+        executor = mock.Mock()
+        executor.submit.return_value.result.side_effect = TimeoutError
+        with mock.patch.object(render_pool, "_get_executor", return_value=executor), \
+                mock.patch.object(render_pool, "_reset_executor") as reset, \
+                mock.patch.object(render_pool, "render_pdf_bytes") as render:
+            with self.assertRaises(render_pool.RenderTimeoutError):
+                render_pool.render_structured_cv_to_pdf_bytes_in_pool({"name": "A"})
+
+        executor.submit.return_value.result.assert_called_once_with(5)
+        reset.assert_called_once()
+        render.assert_not_called()
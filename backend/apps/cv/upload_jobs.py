@@ -0,0 +1,95 @@
+"""
+Post-upload processing (text extraction and vector indexing) off the
+request path.
+
+An upload only has to store the file and the CV row; extracting the text and
+embedding it for vector search can take seconds (parsing, plus an embedding
+API call), so they run on a small in-process thread pool once the upload has
+committed. Like convert jobs, the work lives in this process only: if the
+worker restarts first, the text is extracted lazily by
+`get_or_extract_cv_text` on first use, and the CV can be re-indexed from the
+vector search endpoints.
+"""
+
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
+from typing import Optional
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.utils import timezone
+
+from .models import CV
+from .parse_pool import read_cv_file_in_pool
+
+logger = logging.getLogger(__name__)
+
+_executor: Optional[ThreadPoolExecutor] = None
+_executor_lock = threading.Lock()
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=max(1, getattr(settings, "CV_UPLOAD_JOB_WORKERS", 2)),
+                thread_name_prefix="cv-upload",
+            )
+        return _executor
+
+
+def _process_upload(
+    cv_id, data: Optional[bytes], name: str, content_type: Optional[str]
+) -> None:
+    try:
+        cv_instance = CV.objects.filter(pk=cv_id).first()
+        if cv_instance is None:
+            return
+
+        if data is not None:
+            try:
+                t0 = time.monotonic()
+                extracted = read_cv_file_in_pool(BytesIO(data), name=name, content_type=content_type)
+                cv_instance.extracted_text = extracted
+                cv_instance.text_extracted_at = timezone.now()
+                cv_instance.save(update_fields=["extracted_text", "text_extracted_at"])
+                logger.info(
+                    f"[CV_TEXT_CACHE] Eager extract on upload cv_id={cv_id} "
+                    f"chars={len(extracted)} seconds={time.monotonic() - t0:.3f}"
+                )
+            except Exception as exc:
+                logger.warning(f"[CV_TEXT_CACHE] Eager extract failed cv_id={cv_id}: {exc}")
+
+        try:
+            from apps.vector_search.services import index_cv
+
+            index_cv(cv_instance)
+        except Exception as exc:
+            logger.warning(f"[VECTOR_SEARCH] Index on upload failed cv_id={cv_id}: {exc}")
+    finally:
+        # Executor threads outlive requests; don't leak their DB connection.
+        connection.close()
+
+
+def submit_upload_processing(cv_instance: CV, uploaded_file) -> None:
+    """
+    Extract (unless already known, e.g. for deduplicated uploads) and index
+    `cv_instance` in the background, after the current transaction commits.
+
+    The upload's bytes are read now, since the request's temporary file is
+    gone by the time the job runs.
+    """
+    data = None
+    if cv_instance.text_extracted_at is None:
+        uploaded_file.seek(0)
+        data = uploaded_file.read()
+    content_type = getattr(uploaded_file, "content_type", None)
+    transaction.on_commit(
+        lambda: _get_executor().submit(
+            _process_upload, cv_instance.pk, data, cv_instance.original_filename, content_type
+        )
+    )
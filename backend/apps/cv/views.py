@@ -1,12 +1,12 @@
+import hashlib
 import json
 import logging
-import tempfile
 import time
 from pathlib import Path
 
 from django.conf import settings
+from django.core.cache import cache
 from django.http import HttpResponse
-from django.utils import timezone
 from django.shortcuts import get_object_or_404
 from rest_framework import generics, status
 from rest_framework import serializers
@@ -16,9 +16,11 @@ from rest_framework.response import Response
 from rest_framework.views import APIView
 
 from .models import CV
-from .pdf_renderer import render_structured_cv_to_pdf, _calculate_seniority_label
-from .serializers import CVSerializer
-from .services import get_or_extract_cv_text, read_cv_file
+from .pdf_renderer import _calculate_seniority_label, _categorize_skill
+from .render_pool import RenderTimeoutError, render_structured_cv_to_pdf_bytes_in_pool
+from .serializers import CVSerializer, uploader_name_expression
+from .services import get_or_extract_cv_text
+from .upload_jobs import submit_upload_processing
 from apps.llm.services import generate_structured_cv
 from apps.interview.models import CompetencePaper, ConversationSession
 from apps.api.pagination import StandardPagination
@@ -44,8 +46,12 @@ class CVUploadView(generics.ListCreateAPIView):
     def get_queryset(self):
         # Admins can see all CVs; regular users only see their own
         if getattr(self.request.user, 'is_staff', False):
-            return CV.objects.all().select_related('user').order_by('-uploaded_at')
-        return CV.objects.filter(user=self.request.user).order_by('-uploaded_at')
+            queryset = CV.objects.all()
+        else:
+            queryset = CV.objects.filter(user=self.request.user)
+        # The uploader's display name comes back with each row, so listing
+        # neither joins the full user row nor loads it per CV.
+        return queryset.annotate(uploaded_by_name=uploader_name_expression()).order_by('-uploaded_at')
 
     def create(self, request, *args, **kwargs):
         req_start = time.monotonic()
@@ -55,7 +61,6 @@ class CVUploadView(generics.ListCreateAPIView):
         from django.core.files.storage import default_storage
         storage_backend = f"{type(default_storage).__module__}.{type(default_storage).__name__}"
         django_version = django.__version__
-        print(f"[STORAGE] Before upload - Django {django_version}, default_storage: {storage_backend}")
         logger.info("[STORAGE] Before upload", extra={"django_version": django_version, "storage_backend": storage_backend})
 
         serializer = self.get_serializer(data=request.data)
@@ -76,38 +81,11 @@ class CVUploadView(generics.ListCreateAPIView):
             storage_type = "other"
             storage_description = f"Stored via backend: {storage_backend}"
 
-        print(f"[STORAGE] After upload - stored_in: {storage_type}, file.name: {file_name}, file.url: {file_url}")
         logger.info("[STORAGE] After upload", extra={"storage_type": storage_type, "file_name": file_name, "file_url": file_url})
 
-        try:
-            t0 = time.monotonic()
-            uploaded_file = request.FILES.get("file")
-            uploaded_file.seek(0)
-            extracted = read_cv_file(
-                uploaded_file,
-                name=cv_instance.original_filename,
-                content_type=getattr(uploaded_file, "content_type", None),
-            )
-            cv_instance.extracted_text = extracted
-            cv_instance.text_extracted_at = timezone.now()
-            cv_instance.save(update_fields=["extracted_text", "text_extracted_at"])
-            eager_msg = (
-                f"[CV_TEXT_CACHE] Eager extract on upload cv_id={cv_instance.id} "
-                f"chars={len(extracted)} seconds={time.monotonic() - t0:.3f}"
-            )
-            logger.info(eager_msg)
-            print(eager_msg)
-        except Exception as exc:
-            warn_msg = f"[CV_TEXT_CACHE] Eager extract failed cv_id={cv_instance.id}: {exc}"
-            logger.warning(warn_msg)
-            print(warn_msg)
-
-        # TODO: move to Celery task for async indexing
-        try:
-            from apps.vector_search.services import index_cv as vs_index_cv
-            vs_index_cv(cv_instance)
-        except Exception as exc:
-            logger.warning(f"[VECTOR_SEARCH] Index on upload failed cv_id={cv_instance.id}: {exc}")
+        # Text extraction and vector indexing run after the response; the
+        # text is also extracted lazily on first use if the job hasn't run.
+        submit_upload_processing(cv_instance, request.FILES.get("file"))
 
         # Do not call LLM on upload; just persist the file and return metadata.
         competence_summary = ""
@@ -136,7 +114,6 @@ class CVUploadView(generics.ListCreateAPIView):
             "cv_upload_completed",
             extra={"cv_id": cv_instance.id, "seconds": round(total_elapsed, 3)},
         )
-        print(f"[REQ] upload done cv_id={cv_instance.id} seconds={total_elapsed:.3f}")
         return Response(response_data, status=status.HTTP_201_CREATED, headers=headers)
 
 
@@ -231,6 +208,18 @@ class CVTextView(DocumentedAPIView):
         )
 
 
+def _render_timeout_response() -> Response:
+    return Response(
+        {"detail": "PDF rendering timed out. Please try again."},
+        status=status.HTTP_503_SERVICE_UNAVAILABLE,
+    )
+
+
+def _structured_cv_cache_key(cv_text: str) -> str:
+    text_key = hashlib.blake2b(cv_text.encode("utf-8"), digest_size=16).hexdigest()
+    return f"cv:llm:structured:{text_key}"
+
+
 class FormattedCVView(DocumentedAPIView):
     """
     Generate and return a formatted CV PDF for a given uploaded CV.
@@ -253,32 +242,38 @@ class FormattedCVView(DocumentedAPIView):
             cv_instance = get_object_or_404(CV, pk=pk, user=request.user)
 
         cv_text = get_or_extract_cv_text(cv_instance)
+        template_path = Path(settings.BASE_DIR) / "templates" / "cv_template.html"
+
+        # The structured CV depends only on the CV text, so a repeat download
+        # skips the LLM call. The PDF itself is rendered every time: it is
+        # cheap next to the LLM, and a fallback or stale render never sticks.
+        cache_key = _structured_cv_cache_key(cv_text)
+        structured_cv = cache.get(cache_key)
+        if structured_cv is not None:
+            logger.info(f"[FORMATTED_CACHE] cache_hit cv_id={cv_instance.id}")
+        else:
+            # Generate structured JSON via LLM.
+            llm_start = time.monotonic()
+            logger.debug("[LLM] structured start cv_id=%s", cv_instance.id)
+            structured_cv = generate_structured_cv(cv_text)
+            llm_elapsed = time.monotonic() - llm_start
+            logger.info(
+                "structured_cv_llm_completed",
+                extra={"cv_id": cv_instance.id, "seconds": round(llm_elapsed, 3)},
+            )
+            # An unparseable LLM reply comes back as an all-empty structure;
+            # don't pin that for the whole timeout.
+            if any(structured_cv.values()):
+                cache.set(cache_key, structured_cv, settings.LLM_RESULT_CACHE_TIMEOUT)
 
-        # Generate structured JSON via LLM.
-        llm_start = time.monotonic()
-        print(f"[LLM] structured start cv_id={cv_instance.id}")
-        structured_cv = generate_structured_cv(cv_text)
-        llm_elapsed = time.monotonic() - llm_start
-        logger.info(
-            "structured_cv_llm_completed",
-            extra={"cv_id": cv_instance.id, "seconds": round(llm_elapsed, 3)},
-        )
-        print(f"[LLM] structured done cv_id={cv_instance.id} seconds={llm_elapsed:.3f}")
-
-        # Render PDF to a temp file (no local media storage; Cloudinary only for uploads).
-        safe_name = cv_instance.original_filename.replace("/", "_").replace("\\", "_")
-        with tempfile.TemporaryDirectory() as tmpdir:
-            output_path = Path(tmpdir) / f"cv_{cv_instance.id}_{safe_name}"
-            if not output_path.suffix.lower().endswith(".pdf"):
-                output_path = output_path.with_suffix(".pdf")
-            template_path = Path(settings.BASE_DIR) / "templates" / "cv_template.html"
-            pdf_path = render_structured_cv_to_pdf(
+        # Render PDF in memory (no local media storage; Cloudinary only for uploads).
+        try:
+            pdf_bytes = render_structured_cv_to_pdf_bytes_in_pool(
                 structured_cv,
-                output_path=output_path,
                 html_template_path=template_path,
             )
-            with open(pdf_path, "rb") as f:
-                pdf_bytes = f.read()
+        except RenderTimeoutError:
+            return _render_timeout_response()
 
         response = HttpResponse(
             pdf_bytes,
@@ -293,7 +288,6 @@ class FormattedCVView(DocumentedAPIView):
             "formatted_cv_completed",
             extra={"cv_id": cv_instance.id, "seconds": round(total_elapsed, 3)},
         )
-        print(f"[REQ] formatted done cv_id={cv_instance.id} seconds={total_elapsed:.3f}")
         return response
 
 
@@ -306,16 +300,14 @@ class StructuredCVView(DocumentedAPIView):
     permission_classes = [IsAuthenticated]
 
     def get(self, request, pk):
-        t_total = time.monotonic()
-        req_start = t_total
+        req_start = time.monotonic()
         # Admins can access any CV; regular users only their own
-        t = time.monotonic()
         if getattr(request.user, 'is_staff', False):
             cv_instance = get_object_or_404(CV, pk=pk)
         else:
             cv_instance = get_object_or_404(CV, pk=pk, user=request.user)
-        print(
-            f"[TIMING_VIEW] cv_id={pk} stage=db_lookup seconds={time.monotonic() - t:.3f}"
+        logger.debug(
+            "[TIMING_VIEW] cv_id=%s stage=db_lookup seconds=%.3f", pk, time.monotonic() - req_start
         )
 
         # DISABLED 2026-04-16: This block triggered a Cloudinary fetch (~21s cold-cache cost)
@@ -328,43 +320,24 @@ class StructuredCVView(DocumentedAPIView):
         # print(f"[TIMING_VIEW] cv_id={pk} stage=file_field seconds={time.monotonic() - t:.3f}")
         t = time.monotonic()
         cv_text = get_or_extract_cv_text(cv_instance)
-        print(
-            f"[TIMING_VIEW] cv_id={pk} stage=get_text seconds={time.monotonic() - t:.3f}"
-        )
-
-        t = time.monotonic()
-        print(f"[LLM] structured start cv_id={cv_instance.id}")
-        print(
-            f"[TIMING_VIEW] cv_id={pk} stage=pre_llm seconds={time.monotonic() - t:.3f}"
-        )
+        logger.debug("[TIMING_VIEW] cv_id=%s stage=get_text seconds=%.3f", pk, time.monotonic() - t)
 
+        logger.debug("[LLM] structured start cv_id=%s", cv_instance.id)
         t = time.monotonic()
         structured_cv = generate_structured_cv(cv_text)
         llm_elapsed = time.monotonic() - t
-        print(
-            f"[TIMING_VIEW] cv_id={pk} stage=llm_call seconds={llm_elapsed:.3f}"
-        )
         logger.info(
             "structured_cv_llm_completed",
             extra={"cv_id": cv_instance.id, "seconds": round(llm_elapsed, 3)},
         )
-        print(f"[LLM] structured done cv_id={cv_instance.id} seconds={llm_elapsed:.3f}")
 
-        t = time.monotonic()
         response = Response(structured_cv, status=status.HTTP_200_OK)
-        print(
-            f"[TIMING_VIEW] cv_id={pk} stage=response_build seconds={time.monotonic() - t:.3f}"
-        )
 
         total_elapsed = time.monotonic() - req_start
         logger.info(
             "structured_cv_get_completed",
             extra={"cv_id": cv_instance.id, "seconds": round(total_elapsed, 3)},
         )
-        print(f"[REQ] structured get done cv_id={cv_instance.id} seconds={total_elapsed:.3f}")
-        print(
-            f"[TIMING_VIEW] cv_id={pk} stage=TOTAL seconds={time.monotonic() - t_total:.3f}"
-        )
         return response
 
     def post(self, request, pk):
@@ -390,8 +363,7 @@ class StructuredCVView(DocumentedAPIView):
                 status=status.HTTP_400_BAD_REQUEST,
             )
 
-        # Render PDF to a temp file (no local media storage).
-        safe_name = cv_instance.original_filename.replace("/", "_").replace("\\", "_")
+        # Render PDF in memory (no local media storage).
         if export_type == "competence":
             template_path = Path(settings.BASE_DIR) / "templates" / "competence_template.html"
             download_name = f'{cv_instance.original_filename.rsplit(".", 1)[0]}_competence_letter.pdf'
@@ -399,19 +371,15 @@ class StructuredCVView(DocumentedAPIView):
             template_path = Path(settings.BASE_DIR) / "templates" / "cv_template.html"
             download_name = f'{cv_instance.original_filename.rsplit(".", 1)[0]}_edited.pdf'
 
-        with tempfile.TemporaryDirectory() as tmpdir:
-            output_path = Path(tmpdir) / f"cv_{cv_instance.id}_{safe_name}"
-            if not output_path.suffix.lower().endswith(".pdf"):
-                output_path = output_path.with_suffix(".pdf")
-            pdf_path = render_structured_cv_to_pdf(
+        try:
+            pdf_bytes = render_structured_cv_to_pdf_bytes_in_pool(
                 structured_cv,
-                output_path=output_path,
                 html_template_path=template_path,
                 section_order=section_order,
                 cp_status=cp_status,
             )
-            with open(pdf_path, "rb") as f:
-                pdf_bytes = f.read()
+        except RenderTimeoutError:
+            return _render_timeout_response()
 
         # Store competence paper in DB when exporting competence type
         # IMPORTANT: Store only what was actually exported in the PDF (with same restrictions)
@@ -446,7 +414,7 @@ class StructuredCVView(DocumentedAPIView):
                     competence_content_parts.append(f"• {skill}")
             
             # Core skills: use edited core_skills if provided, otherwise regenerate (same as soft_skills above)
-            core_skills = [str(s).strip() for s in (structured_cv.get("core_skills") or []) if s]
+            core_skills = list(dict.fromkeys(str(s).strip() for s in (structured_cv.get("core_skills") or []) if s))
             if core_skills:
                 competence_content_parts.append(f"\nCore Skills:")
                 for skill in core_skills:
@@ -469,20 +437,9 @@ class StructuredCVView(DocumentedAPIView):
             # 2) Use static keyword-based grouping if no pre-grouped skills (same as pdf_renderer)
             # ALWAYS run this to ensure tech_competencies are created from skills list
             if not tech_competencies:
-                skills = [str(s).strip() for s in (structured_cv.get("skills") or []) if s]
+                skills = list(dict.fromkeys(str(s).strip() for s in (structured_cv.get("skills") or []) if s))
                 for skill in skills:
-                    key = "Other"
-                    lower = skill.lower()
-                    if any(x in lower for x in ["python", "node.js", "nodejs", "php", "java", ".net", "c#", "ruby", "go", "golang", "rust", "spring", "django", "flask", "express", "laravel", "asp.net", "backend", "api", "rest", "graphql"]):
-                        key = "Backend Development"
-                    elif any(x in lower for x in ["react", "vue", "angular", "svelte", "frontend", "css", "html", "javascript", "typescript", "js", "ts", "jquery", "bootstrap", "tailwind", "sass", "scss", "webpack", "vite", "ui", "ux"]):
-                        key = "Frontend & UI"
-                    elif any(x in lower for x in ["sql", "database", "db", "mongo", "mongodb", "postgres", "postgresql", "mysql", "oracle", "redis", "cassandra", "dynamodb", "sqlite", "nosql", "firebase", "supabase"]):
-                        key = "Database & Data"
-                    elif any(x in lower for x in ["devops", "docker", "kubernetes", "k8s", "ci/cd", "ci", "cd", "cloud", "aws", "azure", "gcp", "jenkins", "gitlab", "github actions", "terraform", "ansible", "cloudinary", "heroku", "vercel", "netlify"]):
-                        key = "DevOps & Cloud"
-                    elif any(x in lower for x in ["architecture", "design pattern", "clean code", "solid", "mvc", "mvvm", "microservices", "serverless", "event-driven", "tdd", "bdd", "agile", "scrum", "hexagonal", "onion", "adapter"]):
-                        key = "Architecture & Practices"
+                    key = _categorize_skill(skill)
                     tech_competencies.setdefault(key, []).append(skill)
             
             # Tech Competencies: max 6 categories, max 5 skills per category (same as pdf_renderer)
@@ -600,5 +557,4 @@ class StructuredCVView(DocumentedAPIView):
             "structured_cv_post_completed",
             extra={"cv_id": cv_instance.id, "seconds": round(total_elapsed, 3)},
         )
-        print(f"[REQ] structured post done cv_id={cv_instance.id} seconds={total_elapsed:.3f}")
         return response
\ No newline at end of file
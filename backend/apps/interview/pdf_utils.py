@@ -1,22 +1,13 @@
+import logging
 from pathlib import Path
 from typing import Any
 
 from django.conf import settings
-from fpdf import FPDF
 
+from apps.cv import pdf_renderer
 from apps.cv.pdf_renderer import _sanitize_for_pdf
 
-try:
-    from weasyprint import HTML, CSS  # type: ignore
-    _HTML_RENDER_AVAILABLE = True
-    # print("[PDF] ✅ WeasyPrint is available for interview papers")
-except Exception as exc:
-    _HTML_RENDER_AVAILABLE = False
-    HTML = None  # type: ignore
-    CSS = None  # type: ignore
-    print(f"[PDF] WARNING: WeasyPrint not available for interview papers: {exc}")
-    import traceback
-    traceback.print_exc()
+logger = logging.getLogger(__name__)
 
 
 def render_conversation_paper_to_pdf(
@@ -36,21 +27,29 @@ def render_conversation_paper_to_pdf(
     # Check if content is HTML
     is_html = content.startswith('<!DOCTYPE html>') or content.startswith('<html')
     
-    if is_html and _HTML_RENDER_AVAILABLE and HTML:
+    # WeasyPrint is imported on first use, shared with the CV renderer.
+    if is_html and pdf_renderer.load_html_backend():
         try:
             # Use WeasyPrint to render HTML to PDF (same as preview mode)
             output_path.parent.mkdir(parents=True, exist_ok=True)
             # Use landscape orientation for competence papers (same as preview)
-            css_landscape = CSS(string='@page { size: A4 landscape; }')
-            HTML(string=content).write_pdf(str(output_path), stylesheets=[css_landscape])
+            # The landscape stylesheet and font configuration are built once and
+            # shared with the CV renderer.
+            pdf_renderer.HTML(string=content).write_pdf(
+                str(output_path),
+                stylesheets=[pdf_renderer.landscape_stylesheet()],
+                font_config=pdf_renderer.font_config(),
+            )
             return output_path
         except Exception as e:
             # Fall back to FPDF if WeasyPrint fails
-            print(f"[PDF] WeasyPrint render failed, falling back to FPDF: {e}")
+            logger.warning("[PDF] WeasyPrint render failed, falling back to FPDF: %s", e, exc_info=True)
     
     # Fallback to FPDF for plain text or if WeasyPrint is unavailable
     text = content
     
+    from fpdf import FPDF
+
     pdf = FPDF()
     pdf.set_auto_page_break(auto=True, margin=15)
     pdf.add_page()
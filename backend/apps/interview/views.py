@@ -26,6 +26,7 @@ class DocumentedAPIView(APIView):
     serializer_class = SchemaFallbackSerializer
 
 from apps.cv.models import CV
+from apps.cv.pdf_renderer import get_template
 from apps.interview.models import (
     CompetencePaper,
     ConversationCompetencePaper,
@@ -1438,9 +1439,7 @@ class ConversationCompetencePaperPDFView(DocumentedAPIView):
         
         if template_path.exists():
             try:
-                from jinja2 import Environment, FileSystemLoader
-                env = Environment(loader=FileSystemLoader(template_path.parent))
-                template = env.get_template(template_path.name)
+                template = get_template(template_path)
                 html_content = template.render(**structured_data)
                 logger.info(f"[PDFExport] ✅ Generated HTML from template for paper {paper_id} using edited content")
             except Exception as e:
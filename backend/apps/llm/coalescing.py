@@ -0,0 +1,46 @@
+"""
+In-process request coalescing for expensive LLM calls.
+"""
+
+import threading
+from concurrent.futures import Future
+from typing import Callable, Dict, TypeVar
+
+T = TypeVar("T")
+
+
+class SingleFlight:
+    """
+    Collapse concurrent calls that share a key into a single execution.
+
+    The first caller for a key runs ``fn``; callers that arrive while it is
+    still running wait for and receive the same result (or exception) instead
+    of issuing a duplicate call.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._inflight: Dict[str, Future] = {}
+
+    def do(self, key: str, fn: Callable[..., T], *args, **kwargs) -> T:
+        with self._lock:
+            future = self._inflight.get(key)
+            is_leader = future is None
+            if is_leader:
+                future = Future()
+                self._inflight[key] = future
+
+        if not is_leader:
+            return future.result()
+
+        try:
+            result = fn(*args, **kwargs)
+        except BaseException as exc:
+            future.set_exception(exc)
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            with self._lock:
+                self._inflight.pop(key, None)
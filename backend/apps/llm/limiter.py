@@ -0,0 +1,70 @@
+"""
+Client-side pacing for outbound LLM calls.
+
+Limits are per process: with several gunicorn workers the effective upstream
+rate is the configured rate multiplied by the number of workers.
+"""
+
+import threading
+import time
+from contextlib import contextmanager
+from typing import Iterator, Optional
+
+
+class TokenBucket:
+    """
+    Thread-safe token bucket: `acquire()` blocks until a token is available.
+
+    Tokens refill continuously at `rate` per second up to `capacity`
+    (defaults to one second's worth, so short bursts are allowed).
+    A non-positive rate disables pacing.
+    """
+
+    def __init__(self, rate: float, capacity: Optional[float] = None) -> None:
+        self.rate = rate
+        self.capacity = capacity if capacity is not None else max(1.0, rate)
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self) -> None:
+        if self.rate <= 0:
+            return
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(
+                    self.capacity, self._tokens + (now - self._updated) * self.rate
+                )
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait = (1 - self._tokens) / self.rate
+            time.sleep(wait)
+
+
+class ConcurrencyController:
+    """
+    Bound both the request rate and the number of in-flight calls.
+
+    Usage:
+
+        with controller.acquire():
+            response = requests.post(...)
+    """
+
+    def __init__(self, *, rate: float, max_concurrent: int) -> None:
+        self._bucket = TokenBucket(rate)
+        self._slots = threading.BoundedSemaphore(max_concurrent) if max_concurrent > 0 else None
+
+    @contextmanager
+    def acquire(self) -> Iterator[None]:
+        if self._slots is not None:
+            self._slots.acquire()
+        try:
+            self._bucket.acquire()
+            yield
+        finally:
+            if self._slots is not None:
+                self._slots.release()
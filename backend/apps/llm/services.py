@@ -1,11 +1,15 @@
+import http.cookiejar
 import json
 import logging
 import os
+import threading
 import time
-from typing import Any, Dict, List
+from typing import Any, Dict, Iterator, List, Tuple
 
 import requests
+from requests.adapters import HTTPAdapter
 
+from .limiter import ConcurrencyController
 
 # Basic logger for runtime visibility during backend calls.
 logger = logging.getLogger(__name__)
@@ -23,6 +27,11 @@ OLLAMA_URL = os.environ.get("OLLAMA_URL", "https://ollama.com/api/generate")
 OLLAMA_MODEL = os.environ.get("OLLAMA_MODEL", "gpt-oss:120b-cloud")
 # API key must come from env; no hardcoded fallback.
 OLLAMA_API_KEY = os.environ.get("OLLAMA_API_KEY", "")
+# Client-side pacing for Ollama calls (per process) to stay under provider limits.
+LLM_RPS = float(os.environ.get("LLM_RPS", "5"))
+LLM_MAX_INFLIGHT = int(os.environ.get("LLM_MAX_INFLIGHT", "8"))
+
+_ollama_controller = ConcurrencyController(rate=LLM_RPS, max_concurrent=LLM_MAX_INFLIGHT)
 
 # OpenAI config for recruiter assistant (gpt-4o-mini).
 OPENAI_API_KEY = os.environ.get("OPENAI_API_KEY", "")
@@ -30,10 +39,41 @@ OPENAI_CHAT_COMPLETIONS_URL = "https://api.openai.com/v1/chat/completions"
 OPENAI_AUDIO_SPEECH_URL = "https://api.openai.com/v1/audio/speech"
 OPENAI_RECRUITER_MODEL = os.environ.get("OPENAI_RECRUITER_MODEL", "gpt-4o-mini")
 
+# One pooled HTTP adapter for all outbound LLM calls, so Ollama/OpenAI
+# connections (TCP + TLS) are kept alive and reused across requests instead
+# of being set up per call. Pool size should cover the worker's threads.
+LLM_HTTP_POOL_SIZE = int(os.environ.get("LLM_HTTP_POOL_SIZE", "16"))
+
+_http_adapter = HTTPAdapter(pool_connections=4, pool_maxsize=LLM_HTTP_POOL_SIZE)
+_http_local = threading.local()
+
+
+class _BlockAllCookies(http.cookiejar.DefaultCookiePolicy):
+    def set_ok(self, cookie, request):
+        return False
+
+    def return_ok(self, cookie, request):
+        return False
+
+
+def _http_session() -> requests.Session:
+    """
+    This thread's session for LLM calls. Sessions aren't shared between
+    threads, keep no cookies, and all use the one pooled adapter.
+    """
+    session = getattr(_http_local, "session", None)
+    if session is None:
+        session = requests.Session()
+        session.cookies.set_policy(_BlockAllCookies())
+        session.mount("https://", _http_adapter)
+        session.mount("http://", _http_adapter)
+        _http_local.session = session
+    return session
+
 # ---------------------------------------------------------------------------
 # BLOCKING GPT RESPONSE: The API that returns the GPT reply and blocks the flow
 # is OpenAI Chat Completions (OPENAI_CHAT_COMPLETIONS_URL), called inside
-# generate_recruiter_next_question() below. That call uses a single requests.post()
+# generate_recruiter_next_question() below. That call uses a single _http_session().post()
 # with no stream=True, so we wait for the FULL JSON response before continuing.
 # It is only invoked AFTER transcribe_audio_whisper() returns, so Whisper blocks
 # first, then this call blocks until the full next-question JSON is ready.
@@ -150,7 +190,7 @@ Return ONLY the corrected text, nothing else.
 """.strip()
     
     try:
-        resp = requests.post(
+        resp = _http_session().post(
             OPENAI_CHAT_COMPLETIONS_URL,
             headers={
                 "Authorization": f"Bearer {OPENAI_API_KEY}",
@@ -268,7 +308,7 @@ Rules:
     }
 
     try:
-        resp = requests.post(
+        resp = _http_session().post(
             OPENAI_CHAT_COMPLETIONS_URL,
             headers={
                 "Authorization": f"Bearer {OPENAI_API_KEY}",
@@ -387,7 +427,7 @@ def generate_recruiter_next_question(
         # BLOCKING: This is the API that returns the GPT response. We wait for the full
         # response (no streaming) before returning; called from stream_voice_to_question
         # only after Whisper has already returned.
-        resp = requests.post(
+        resp = _http_session().post(
             OPENAI_CHAT_COMPLETIONS_URL,
             headers={
                 "Authorization": f"Bearer {OPENAI_API_KEY}",
@@ -530,7 +570,7 @@ def generate_ai_voice(text: str) -> bytes:
     
     try:
         start = time.monotonic()
-        resp = requests.post(
+        resp = _http_session().post(
             OPENAI_AUDIO_SPEECH_URL,
             headers={
                 "Authorization": f"Bearer {OPENAI_API_KEY}",
@@ -558,9 +598,12 @@ def generate_ai_voice(text: str) -> bytes:
         raise
 
 
-def _ollama(prompt: str, *, model: str = OLLAMA_MODEL) -> str:
+def _ollama_stream(prompt: str, *, model: str = OLLAMA_MODEL) -> Iterator[str]:
     """
-    Minimal Ollama client.
+    Minimal streaming Ollama client: yields response fragments as they decode.
+
+    The limiter slot is held until the stream is exhausted or the generator is
+    closed (e.g. when an SSE client disconnects).
     """
     t_ollama = time.monotonic()
     headers = {}
@@ -574,40 +617,114 @@ def _ollama(prompt: str, *, model: str = OLLAMA_MODEL) -> str:
     start = time.monotonic()
     logger.info("Calling Ollama", extra={"model": model, "url": OLLAMA_URL})
 
-    t_post = time.monotonic()
-    response = requests.post(
-        OLLAMA_URL,
-        json={"model": model, "prompt": prompt},
-        headers=headers,
-        stream=True,
-        timeout=300,
-    )
-    response.raise_for_status()
-    logger.info(
-        f"[TIMING_LLM] stage=ollama_requests_post_to_headers_ok seconds={time.monotonic() - t_post:.3f}"
-    )
-
-    full_out = ""
-    t_stream = time.monotonic()
-    for line in response.iter_lines():
-        if not line:
-            continue
-        try:
-            data = json.loads(line.decode("utf-8"))
-        except json.JSONDecodeError:
-            continue
-        full_out += data.get("response", "")
-    logger.info(
-        f"[TIMING_LLM] stage=ollama_stream_iter_lines seconds={time.monotonic() - t_stream:.3f}"
-    )
+    chars = 0
+    with _ollama_controller.acquire():
+        logger.info(
+            f"[TIMING_LLM] stage=ollama_limiter_wait seconds={time.monotonic() - start:.3f}"
+        )
+        t_post = time.monotonic()
+        with _http_session().post(
+            OLLAMA_URL,
+            json={"model": model, "prompt": prompt},
+            headers=headers,
+            stream=True,
+            timeout=300,
+        ) as response:
+            response.raise_for_status()
+            logger.info(
+                f"[TIMING_LLM] stage=ollama_requests_post_to_headers_ok seconds={time.monotonic() - t_post:.3f}"
+            )
+
+            t_stream = time.monotonic()
+            for line in response.iter_lines():
+                if not line:
+                    continue
+                try:
+                    data = json.loads(line.decode("utf-8"))
+                except json.JSONDecodeError:
+                    continue
+                fragment = data.get("response", "")
+                if fragment:
+                    chars += len(fragment)
+                    yield fragment
+            logger.info(
+                f"[TIMING_LLM] stage=ollama_stream_iter_lines seconds={time.monotonic() - t_stream:.3f}"
+            )
 
     elapsed = time.monotonic() - start
     logger.info(
         "Ollama call completed",
-        extra={"model": model, "url": OLLAMA_URL, "chars": len(full_out), "seconds": round(elapsed, 3)},
+        extra={"model": model, "url": OLLAMA_URL, "chars": chars, "seconds": round(elapsed, 3)},
     )
     logger.info(f"[TIMING_LLM] stage=ollama_wall_total seconds={elapsed:.3f}")
-    return full_out
+
+
+def _ollama(prompt: str, *, model: str = OLLAMA_MODEL) -> str:
+    """
+    Minimal Ollama client.
+    """
+    return "".join(_ollama_stream(prompt, model=model))
+
+
+# Rough chars-per-token ratio used when tiktoken is unavailable.
+_CHARS_PER_TOKEN = 4
+
+
+# tiktoken downloads the BPE file on first use; a failed load is retried
+# after this many seconds instead of pinning the estimate until restart.
+_TOKEN_ENCODING_RETRY_SECONDS = 60
+
+_token_encoding_lock = threading.Lock()
+_token_encoding_value = None
+_token_encoding_retry_at = 0.0
+
+
+def _token_encoding():
+    """
+    Load the BPE encoding once per process; None while it is unavailable.
+    """
+    global _token_encoding_value, _token_encoding_retry_at
+    if _token_encoding_value is not None or time.monotonic() < _token_encoding_retry_at:
+        return _token_encoding_value
+    with _token_encoding_lock:
+        if _token_encoding_value is None and time.monotonic() >= _token_encoding_retry_at:
+            try:
+                import tiktoken
+            except ImportError as e:
+                # Not installed: retrying won't help.
+                logger.warning(f"tiktoken unavailable, using character estimate: {e}")
+                _token_encoding_retry_at = float("inf")
+                return None
+            try:
+                _token_encoding_value = tiktoken.get_encoding("cl100k_base")
+            except Exception as e:
+                logger.warning(
+                    f"tiktoken encoding failed to load, using character estimate "
+                    f"for {_TOKEN_ENCODING_RETRY_SECONDS}s: {e}"
+                )
+                _token_encoding_retry_at = time.monotonic() + _TOKEN_ENCODING_RETRY_SECONDS
+    return _token_encoding_value
+
+
+def trim_to_token_budget(text: str, max_tokens: int) -> Tuple[str, int]:
+    """
+    Trim `text` to at most `max_tokens` tokens.
+
+    Returns (trimmed_text, num_tokens). Without tiktoken the count and cut
+    are estimated from character length.
+    """
+    if not text:
+        return "", 0
+
+    encoding = _token_encoding()
+    if encoding is None:
+        trimmed = text[: max_tokens * _CHARS_PER_TOKEN]
+        return trimmed, -(-len(trimmed) // _CHARS_PER_TOKEN)
+
+    tokens = encoding.encode(text, disallowed_special=())
+    if len(tokens) <= max_tokens:
+        return text, len(tokens)
+    return encoding.decode(tokens[:max_tokens]), max_tokens
 
 
 def _extract_first_json_object(raw: str) -> Dict[str, Any]:
@@ -652,16 +769,10 @@ CV TEXT:
 """.strip()
 
 
-def generate_competence_cv(cv_text: str) -> Dict[str, object]:
+def _parse_competence_output(raw: str) -> Dict[str, object]:
     """
-    Call the LLaMA model with the given CV text.
+    Turn the raw competence completion into {"competence_summary", "skills"}.
     """
-    if not cv_text or not cv_text.strip():
-        return {"competence_summary": "", "skills": []}
-
-    prompt = _build_competence_prompt(cv_text)
-    
-    raw = _ollama(prompt)
     data = _extract_first_json_object(raw)
     
     if not data:
@@ -686,6 +797,39 @@ def generate_competence_cv(cv_text: str) -> Dict[str, object]:
     }
 
 
+def generate_competence_cv(cv_text: str) -> Dict[str, object]:
+    """
+    Call the LLaMA model with the given CV text.
+    """
+    if not cv_text or not cv_text.strip():
+        return {"competence_summary": "", "skills": []}
+
+    prompt = _build_competence_prompt(cv_text)
+    
+    raw = _ollama(prompt)
+    return _parse_competence_output(raw)
+
+
+def stream_competence_cv(cv_text: str) -> Iterator[Dict[str, Any]]:
+    """
+    Generator for SSE: yields {"type": "token", "token": ...} for each decoded
+    fragment, then {"type": "done", "competence_summary": ..., "skills": [...]}
+    with the same parsed result generate_competence_cv() returns.
+    """
+    if not cv_text or not cv_text.strip():
+        yield {"type": "done", "competence_summary": "", "skills": []}
+        return
+
+    prompt = _build_competence_prompt(cv_text)
+
+    fragments: List[str] = []
+    for fragment in _ollama_stream(prompt):
+        fragments.append(fragment)
+        yield {"type": "token", "token": fragment}
+
+    yield {"type": "done", **_parse_competence_output("".join(fragments))}
+
+
 # ---------------------------------------------------------------------------
 # Structured CV generation
 # ---------------------------------------------------------------------------
@@ -983,6 +1127,13 @@ INPUT SKILLS:
 """.strip()
 
 
+# Successful groupings keyed on the sorted unique skills, so CVs that share a
+# skill set (in any order) reuse one LLM call. Oldest entries are evicted first.
+_SKILL_GROUP_CACHE: Dict[Tuple[str, ...], Dict[str, List[str]]] = {}
+_SKILL_GROUP_CACHE_MAX = 512
+_skill_group_cache_lock = threading.Lock()
+
+
 def group_skills_into_categories(skills: List[str]) -> Dict[str, List[str]]:
     """
     Use the LLM to group a flat list of skills.
@@ -1000,6 +1151,12 @@ def group_skills_into_categories(skills: List[str]) -> Dict[str, List[str]]:
     if not unique_skills:
         return {}
 
+    cache_key = tuple(sorted(unique_skills))
+    with _skill_group_cache_lock:
+        cached = _SKILL_GROUP_CACHE.get(cache_key)
+    if cached is not None:
+        return {name: list(values) for name, values in cached.items()}
+
     prompt = _build_skill_grouping_prompt(unique_skills)
     
     raw = _ollama(prompt)
@@ -1035,6 +1192,13 @@ def group_skills_into_categories(skills: List[str]) -> Dict[str, List[str]]:
         if final_skills:
             grouped[name] = final_skills
 
+    # Empty results usually mean the LLM reply was unusable; don't pin those.
+    if grouped:
+        with _skill_group_cache_lock:
+            if len(_SKILL_GROUP_CACHE) >= _SKILL_GROUP_CACHE_MAX:
+                _SKILL_GROUP_CACHE.pop(next(iter(_SKILL_GROUP_CACHE)))
+            _SKILL_GROUP_CACHE[cache_key] = {name: list(values) for name, values in grouped.items()}
+
     return grouped
 
 
@@ -1132,7 +1296,7 @@ def transcribe_audio_whisper(audio_file) -> Dict[str, str]:
             'response_format': 'verbose_json',  # Get language detection info
         }
         
-        resp = requests.post(
+        resp = _http_session().post(
             "https://api.openai.com/v1/audio/transcriptions",
             headers={
                 "Authorization": f"Bearer {OPENAI_API_KEY}",
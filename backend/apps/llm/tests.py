@@ -1,3 +1,175 @@
-from django.test import TestCase
+import sys
+import threading
+import time
+from unittest import mock
 
-# Create your tests here.
+from django.test import SimpleTestCase
+
+from .coalescing import SingleFlight
+from . import services
+from .limiter import ConcurrencyController, TokenBucket
+from .services import (
+    _SKILL_GROUP_CACHE,
+    group_skills_into_categories,
+    stream_competence_cv,
+    trim_to_token_budget,
+)
+
+
+class SingleFlightTests(SimpleTestCase):
+    def test_concurrent_callers_share_one_execution(self):
+        flight = SingleFlight()
+        calls = []
+
+        def slow(value):
+            calls.append(value)
+            time.sleep(0.05)
+            return {"value": value}
+
+        results = []
+        threads = [
+            threading.Thread(target=lambda: results.append(flight.do("k", slow, 1)))
+            for _ in range(5)
+        ]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(results, [{"value": 1}] * 5)
+
+    def test_exception_is_propagated_and_key_released(self):
+        flight = SingleFlight()
+
+        def boom():
+            raise RuntimeError("upstream down")
+
+        with self.assertRaises(RuntimeError):
+            flight.do("k", boom)
+        self.assertEqual(flight.do("k", lambda: "ok"), "ok")
+
+
+class TokenBucketTests(SimpleTestCase):
+    def test_burst_up_to_capacity_then_paced(self):
+        bucket = TokenBucket(rate=20, capacity=2)
+        start = time.monotonic()
+        for _ in range(3):
+            bucket.acquire()
+        # Two tokens are available immediately; the third waits ~1/rate.
+        self.assertGreaterEqual(time.monotonic() - start, 0.04)
+
+    def test_non_positive_rate_disables_pacing(self):
+        bucket = TokenBucket(rate=0)
+        start = time.monotonic()
+        for _ in range(100):
+            bucket.acquire()
+        self.assertLess(time.monotonic() - start, 0.05)
+
+
+class ConcurrencyControllerTests(SimpleTestCase):
+    def test_caps_in_flight_calls(self):
+        controller = ConcurrencyController(rate=0, max_concurrent=2)
+        lock = threading.Lock()
+        active = []
+        peak = []
+
+        def work():
+            with controller.acquire():
+                with lock:
+                    active.append(1)
+                    peak.append(len(active))
+                time.sleep(0.02)
+                with lock:
+                    active.pop()
+
+        threads = [threading.Thread(target=work) for _ in range(6)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+        self.assertLessEqual(max(peak), 2)
+
+
+class StreamCompetenceCVTests(SimpleTestCase):
+    def test_yields_tokens_then_parsed_result(self):
+        fragments = ['{"competence_summary": "Ada ', 'builds compilers.", ', '"skills": [" C ", "Rust"]}']
+        with mock.patch("apps.llm.services._ollama_stream", return_value=iter(fragments)):
+            chunks = list(stream_competence_cv("Ada Lovelace, compiler engineer"))
+
+        self.assertEqual([c["token"] for c in chunks[:-1]], fragments)
+        self.assertEqual(
+            chunks[-1],
+            {"type": "done", "competence_summary": "Ada builds compilers.", "skills": ["C", "Rust"]},
+        )
+
+    def test_empty_text_skips_llm(self):
+        with mock.patch("apps.llm.services._ollama_stream") as ollama_stream:
+            chunks = list(stream_competence_cv("   "))
+
+        ollama_stream.assert_not_called()
+        self.assertEqual(chunks, [{"type": "done", "competence_summary": "", "skills": []}])
+
+
+class GroupSkillsCacheTests(SimpleTestCase):
+    def setUp(self):
+        _SKILL_GROUP_CACHE.clear()
+        self.addCleanup(_SKILL_GROUP_CACHE.clear)
+
+    def test_same_skill_set_reuses_llm_result(self):
+        reply = '{"groups": [{"name": "Backend", "skills": ["Python", "Django"]}]}'
+        with mock.patch("apps.llm.services._ollama", return_value=reply) as ollama:
+            first = group_skills_into_categories(["Python", "Django"])
+            second = group_skills_into_categories(["Django", " Python ", "python"])
+
+        ollama.assert_called_once()
+        self.assertEqual(first, {"Backend": ["Python", "Django"]})
+        self.assertEqual(second, first)
+
+    def test_unusable_reply_is_not_cached(self):
+        with mock.patch("apps.llm.services._ollama", return_value="not json") as ollama:
+            self.assertEqual(group_skills_into_categories(["Python"]), {})
+            self.assertEqual(group_skills_into_categories(["Python"]), {})
+
+        self.assertEqual(ollama.call_count, 2)
+
+
+class TrimToTokenBudgetTests(SimpleTestCase):
+    def test_character_estimate_without_tiktoken(self):
+        with mock.patch("apps.llm.services._token_encoding", return_value=None):
+            self.assertEqual(trim_to_token_budget("abcdefghij", 2), ("abcdefgh", 2))
+            self.assertEqual(trim_to_token_budget("abcde", 10), ("abcde", 2))
+            self.assertEqual(trim_to_token_budget("", 10), ("", 0))
+
+
+class TokenEncodingTests(SimpleTestCase):
+    def setUp(self):
+        for name, value in (("_token_encoding_value", None), ("_token_encoding_retry_at", 0.0)):
+            patcher = mock.patch.object(services, name, value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def test_failed_load_is_retried_after_backoff(self):
+        fake_tiktoken = mock.Mock()
+        fake_tiktoken.get_encoding.side_effect = [OSError("download failed"), "encoding"]
+        with mock.patch.dict(sys.modules, {"tiktoken": fake_tiktoken}), \
+                mock.patch("apps.llm.services.time.monotonic", side_effect=[0.0, 0.0, 0.0, 1.0, 100.0, 100.0]):
+            self.assertIsNone(services._token_encoding())
+            self.assertIsNone(services._token_encoding())
+            self.assertEqual(services._token_encoding(), "encoding")
+
+        self.assertEqual(fake_tiktoken.get_encoding.call_count, 2)
+
+
+class HttpSessionTests(SimpleTestCase):
+    def test_each_thread_gets_its_own_session_on_the_shared_pool(self):
+        other = []
+        thread = threading.Thread(target=lambda: other.append(services._http_session()))
+        thread.start()
+        thread.join()
+
+        session = services._http_session()
+        self.assertIs(services._http_session(), session)
+        self.assertIsNot(other[0], session)
+        self.assertIs(other[0].get_adapter("https://api.openai.com"), session.get_adapter("https://api.openai.com"))
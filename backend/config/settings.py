@@ -149,6 +149,63 @@ else:
     }
 
 
+# Cache
+# Redis is shared by all workers when REDIS_URL is set; otherwise each process
+# keeps its own in-memory cache.
+REDIS_URL = os.environ.get("REDIS_URL", "")
+
+if REDIS_URL:
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.redis.RedisCache",
+            "LOCATION": REDIS_URL,
+        }
+    }
+else:
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        }
+    }
+
+# How long LLM results for identical CV text are reused (seconds).
+LLM_RESULT_CACHE_TIMEOUT = int(os.environ.get("LLM_RESULT_CACHE_TIMEOUT", 60 * 60 * 24))
+
+
+# CV conversion limits: uploads above these are rejected before parsing, and
+# extracted text is truncated before it is sent to the LLM.
+CV_MAX_BYTES = int(os.environ.get("CV_MAX_BYTES", 10 * 1024 * 1024))
+CV_MAX_PAGES = int(os.environ.get("CV_MAX_PAGES", 20))
+CV_MAX_CHARS = int(os.environ.get("CV_MAX_CHARS", 40000))
+CV_MAX_TOKENS = int(os.environ.get("CV_MAX_TOKENS", 10000))
+
+# Worker processes used to parse uploaded PDF/DOCX files off the GIL (0 = parse in-process).
+# Each web worker starts its own pool, so this is opt-in.
+CV_PARSE_WORKERS = int(os.environ.get("CV_PARSE_WORKERS", 0))
+# Seconds to wait for a pool worker before parsing in-process instead.
+CV_PARSE_TIMEOUT = int(os.environ.get("CV_PARSE_TIMEOUT", 30))
+
+# Worker processes used to render PDFs off the GIL (0 = render in-process).
+CV_RENDER_WORKERS = int(os.environ.get("CV_RENDER_WORKERS", 0))
+# Seconds to wait for a pool worker's render before failing the request.
+CV_RENDER_TIMEOUT = int(os.environ.get("CV_RENDER_TIMEOUT", 60))
+
+# On-disk cache of compiled Jinja templates shared by worker processes.
+JINJA_BYTECODE_CACHE = os.environ.get("JINJA_BYTECODE_CACHE", "1") != "0"
+JINJA_BYTECODE_CACHE_DIR = os.environ.get("JINJA_BYTECODE_CACHE_DIR", "")
+
+# Threads per process extracting and indexing uploaded CVs after the response.
+CV_UPLOAD_JOB_WORKERS = int(os.environ.get("CV_UPLOAD_JOB_WORKERS", 2))
+
+# Threads per process running background ("async": true) convert jobs.
+CONVERT_JOB_WORKERS = int(os.environ.get("CONVERT_JOB_WORKERS", 4))
+
+# Per-user cap on concurrent converts (0 = unlimited). The counter expires
+# after CONVERT_SLOT_TIMEOUT seconds in case a worker dies holding a slot.
+CONVERT_MAX_INFLIGHT_PER_USER = int(os.environ.get("CONVERT_MAX_INFLIGHT_PER_USER", 3))
+CONVERT_SLOT_TIMEOUT = int(os.environ.get("CONVERT_SLOT_TIMEOUT", 300))
+
+
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
 
@@ -207,6 +264,10 @@ REST_FRAMEWORK = {
     'DEFAULT_PERMISSION_CLASSES': [
         'rest_framework.permissions.IsAuthenticated',
     ],
+    'DEFAULT_RENDERER_CLASSES': [
+        'apps.api.renderers.ORJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ],
     'DEFAULT_SCHEMA_CLASS': 'drf_spectacular.openapi.AutoSchema',
 } 
 
@@ -0,0 +1,19 @@
+"""
+Gunicorn server hooks.
+
+Command-line options live in the Dockerfile CMD; this file only adds hooks.
+"""
+import os
+
+
+def when_ready(server):
+    # Runs in the master after --preload, before workers fork: importing
+    # WeasyPrint and compiling the templates here keeps them shared
+    # copy-on-write instead of each worker paying for it on its first render.
+    # No page is laid out here, so the master never touches fontconfig/pango
+    # before forking. Set DJANGO_SKIP_PDF_WARMUP=1 to skip it (local/CI runs).
+    if os.environ.get("DJANGO_SKIP_PDF_WARMUP", "0") != "0":
+        return
+    from apps.cv.pdf_renderer import warm_html_backend
+
+    warm_html_backend(render=False)